@@ -1,5 +1,36 @@
+import argparse
+
+
 def main():
-    print("Hello from stock-volatility-ai!")
+    parser = argparse.ArgumentParser(description="stock-volatility-ai")
+    commands = parser.add_subparsers(dest="command")
+
+    profile = commands.add_parser(
+        "profile", help="profile a pipeline stage on synthetic data (speedscope output)"
+    )
+    profile.add_argument(
+        "stage", choices=["features", "regime", "panel", "labels", "train", "pipeline"]
+    )
+    profile.add_argument("--days", type=int, default=1500)
+    profile.add_argument("--tickers", type=int, default=10)
+    profile.add_argument("--repeat", type=int, default=5)
+    profile.add_argument("--out-dir", default="profiles")
+
+    args = parser.parse_args()
+
+    if args.command == "profile":
+        from src.profiling import profile_stage
+
+        path = profile_stage(
+            args.stage,
+            n_days=args.days,
+            n_tickers=args.tickers,
+            repeat=args.repeat,
+            out_dir=args.out_dir
+        )
+        print(f"🔥 Profile saved → {path} (open in https://www.speedscope.app)")
+    else:
+        parser.print_help()
 
 
 if __name__ == "__main__":
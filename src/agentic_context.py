@@ -1,17 +1,68 @@
-from typing import TypedDict, List
+from typing import TypedDict, List, Dict, Optional, Any
 
-from langgraph.graph import StateGraph
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import SystemMessage, HumanMessage
-from dotenv import load_dotenv
 import os
+import threading
 from src.model_inference import predict_volatility
 from src.report_builder import build_final_report
+from src.summarizers import register_summarizer
 import json
 
 
+# LangGraph / Gemini / dotenv are heavy imports; they are loaded on
+# first use (or by the API warmup) so importing this module stays cheap.
+_AGENT = None
+_LLM = None
+_DISPATCHER = None
+_LAZY_LOCK = threading.Lock()
 
-load_dotenv()  # 👈 loads .env into environment
+
+def _get_llm():
+    global _LLM
+
+    if _LLM is None:
+        with _LAZY_LOCK:
+            if _LLM is None:
+                from dotenv import load_dotenv
+                from langchain_google_genai import ChatGoogleGenerativeAI
+
+                load_dotenv()  # 👈 loads .env into environment
+
+                _LLM = ChatGoogleGenerativeAI(
+                    model="gemini-2.5-flash",
+                    temperature=0.2
+                )
+
+    return _LLM
+
+
+def _gemini_backend(system: str, user: str, timeout=None) -> str:
+    from langchain_core.messages import SystemMessage, HumanMessage
+
+    # Call-time timeout (seconds): a hung request must not outlive the
+    # caller's stage budget and keep a worker busy
+    kwargs = {} if timeout is None else {"timeout": timeout}
+
+    response = _get_llm().invoke([
+        SystemMessage(content=system),
+        HumanMessage(content=user)
+    ], **kwargs)
+    return response.content
+
+
+def get_dispatcher():
+    """
+    Process-wide LLM dispatcher (concurrency limit, rate limit, batching).
+    """
+    global _DISPATCHER
+
+    if _DISPATCHER is None:
+        from src.llm_dispatcher import LLMDispatcher
+
+        with _LAZY_LOCK:
+            if _DISPATCHER is None:
+                _DISPATCHER = LLMDispatcher(_gemini_backend)
+
+    return _DISPATCHER
 
 
 
@@ -25,6 +76,15 @@ class ContextState(TypedDict):
     summary: str
     risk_score: float
     risk_bucket: str
+    model_version: str
+    as_of: Optional[str]  # bar date the model scored (date is the request day)
+    contributions: Dict[str, float]
+    news_fetched: bool
+    news_filter: Dict[str, int]
+    summarizer: str
+    summary_budget_ms: Optional[float]
+    summary_degraded: bool
+    deadline: Any  # src.deadline.Deadline | None
     risk_type: str
     exogenous_shock: bool
     context_alignment: str
@@ -65,17 +125,106 @@ from src.news_fetcher import fetch_google_news
     return state
 '''
 
-def fetch_news(state: ContextState) -> ContextState:
-    query = state["ticker"].replace(".NS", "")
+NEWS_MAX_ITEMS = 8
 
-    headlines = fetch_google_news(
+
+def fetch_ticker_news(ticker: str, reference_date: str):
+    """
+    Fetch headlines, then drop syndicated near-duplicates and off-topic
+    items locally so only distinct, relevant ones reach the LLM.
+    Returns (headlines, filter_report).
+    """
+    from src.news_filter import filter_headlines
+
+    query = ticker.replace(".NS", "")
+
+    # Over-fetch: syndicated copies would otherwise fill the item budget
+    raw = fetch_google_news(
         query=query,
-        reference_date=state["date"],
+        reference_date=reference_date,
         window_days=3,
-        max_items=8
+        max_items=NEWS_MAX_ITEMS * 3
     )
 
-    state["news"] = headlines
+    return filter_headlines(raw, ticker, max_items=NEWS_MAX_ITEMS)
+
+
+def news_stage(ticker: str, reference_date: str, deadline=None):
+    """
+    fetch_ticker_news within the request's news budget.
+    On timeout or feed errors the stage is skipped (no headlines).
+    """
+    if deadline is None:
+        return fetch_ticker_news(ticker, reference_date)
+
+    from src.deadline import StageTimeout
+
+    try:
+        return deadline.run("news", fetch_ticker_news, ticker, reference_date)
+    except StageTimeout:
+        deadline.skip("news", "timeout")
+    except Exception as e:
+        deadline.skip("news", f"error: {type(e).__name__}")
+
+    return [], {}
+
+
+def model_stage(ticker: str, deadline=None):
+    """
+    Model output within the market-data and model budgets.
+    On overrun, falls back to the last prediction made for the ticker
+    (marked stale); with nothing to fall back to, StageTimeout propagates.
+    """
+    if deadline is None:
+        return predict_volatility(ticker)
+
+    from src.deadline import StageTimeout
+    from src.model_inference import (
+        check_supported,
+        fetch_latest_features,
+        load_model,
+        score_latest,
+        last_prediction
+    )
+
+    check_supported([ticker])
+
+    def market_data():
+        latest_row = fetch_latest_features(ticker)
+        # A cold model load (unpickle, lightgbm import) belongs here, so
+        # the model budget only covers scoring
+        load_model(ticker.upper())
+        return latest_row
+
+    try:
+        latest_row = deadline.run("market_data", market_data)
+        model_out = deadline.run("model", score_latest, ticker, latest_row)
+    except StageTimeout as e:
+        stale = last_prediction(ticker)
+        if stale is None:
+            raise
+        deadline.skip(e.stage, "timeout: served last known prediction")
+        return {**stale, "stale": True}
+
+    # Market context not caught up with the bar: the report is degraded
+    # (lower confidence, not cached) until it is
+    if model_out.get("stale"):
+        deadline.skip("market_data", "market context behind the bar: served last known prediction")
+    elif model_out.get("degraded"):
+        deadline.skip("market_data", "market context behind the bar: scored without contagion features")
+
+    return model_out
+
+
+def fetch_news(state: ContextState) -> ContextState:
+    # Headlines may already have been fetched by the caller (API cache key)
+    if state.get("news_fetched"):
+        return state
+
+    state["news"], state["news_filter"] = news_stage(
+        state["ticker"], state["date"], state.get("deadline")
+    )
+    state["news_fetched"] = True
     return state
 
 
@@ -143,39 +292,71 @@ def summarize_news(state: ContextState) -> ContextState:
     If no relevant news exists, explicitly state that.
     """
 
+    deadline = state.get("deadline")
+
     if not state["news"]:
-        state["summary"] = (
-            f"No time-aligned news was found around {state['date']} "
-            f"to explain volatility in {state['ticker']}. "
-            "The volatility signal may be driven by endogenous market dynamics."
-        )
+        if deadline is not None and any(
+            skipped["stage"] == "news" for skipped in deadline.skipped_stages
+        ):
+            state["summary"] = (
+                f"News for {state['ticker']} could not be retrieved within the "
+                "latency budget. This report reflects the model signal only."
+            )
+            state["summary_degraded"] = True
+        else:
+            state["summary"] = (
+                f"No time-aligned news was found around {state['date']} "
+                f"to explain volatility in {state['ticker']}. "
+                "The volatility signal may be driven by endogenous market dynamics."
+            )
+        state["summarizer"] = "none"
         return state
 
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        temperature=0.2
-    )
-
-    prompt = f"""
-You are given news headlines published around {state['date']}.
+    from src.summarizers import choose_summarizer, summarize
 
-IMPORTANT:
-- Base your reasoning strictly on the provided headlines.
-- If the headlines are insufficient to explain volatility, explicitly state that.
-- Do NOT infer context from outdated events.
+    budget_ms = state.get("summary_budget_ms")
+    if budget_ms is None and deadline is not None:
+        budget_ms = deadline.stage_budget_ms("summary")
 
-Summarize possible drivers of stock volatility for {state['ticker']}.
-"""
+    name = choose_summarizer(state.get("summarizer") or "auto", budget_ms)
+    args = (state["ticker"], state["date"], state["news"])
 
-    messages = [
-        SystemMessage(content=prompt),
-        HumanMessage(content="\n".join(state["news"]))
-    ]
+    if deadline is None:
+        state["summary"] = summarize(name, *args)
 
-    response = llm.invoke(messages)
-    state["summary"] = response.content
+    else:
+        from src.deadline import StageTimeout
+
+        try:
+            # The stage budget also bounds the LLM request itself, so a
+            # timed-out call frees its worker instead of hanging on
+            timeout = deadline.stage_budget_ms("summary") / 1000
+            state["summary"] = deadline.run(
+                "summary", summarize, name, *args, timeout=timeout
+            )
+        except Exception as e:
+            if name == "extractive":
+                raise
+
+            # Slow or failing LLM: the local extractive summary is instant
+            reason = "timeout" if isinstance(e, StageTimeout) else f"error: {type(e).__name__}"
+            deadline.skip("summary", reason)
+            state["summary"] = summarize("extractive", *args)
+            state["summary_degraded"] = True
+            name = "extractive"
+
+    state["summarizer"] = name
     return state
 
+
+def _llm_summarize(ticker: str, date: str, headlines, timeout=None) -> str:
+    # Shared, rate-limited dispatcher: concurrent requests for several
+    # tickers are micro-batched into one Gemini call
+    return get_dispatcher().summarize(ticker, date, headlines, timeout=timeout)
+
+register_summarizer("llm")(_llm_summarize)
+
+
 def reconcile_signal(state: ContextState) -> ContextState:
     if state["risk_bucket"] == "high" and state["exogenous_shock"]:
         state["final_signal"] = "high_risk_avoid"
@@ -198,6 +379,8 @@ def reconcile_signal(state: ContextState) -> ContextState:
 # ----------------------------
 
 def build_agent():
+    from langgraph.graph import StateGraph
+
     graph = StateGraph(ContextState)
 
     graph.add_node("fetch_news", fetch_news)
@@ -214,45 +397,74 @@ def build_agent():
     return graph.compile()
 
 
+def get_agent():
+    """
+    Compiled agent graph, built once per process.
+    """
+    global _AGENT
+
+    if _AGENT is None:
+        with _LAZY_LOCK:
+            if _AGENT is None:
+                _AGENT = build_agent()
+
+    return _AGENT
+
 
-def run_pipeline(ticker: str) -> dict:
+
+def run_pipeline(
+    ticker: str,
+    model_out=None,
+    news=None,
+    news_filter=None,
+    report_date=None,
+    summarizer="auto",
+    summary_budget_ms=None,
+    deadline=None
+) -> dict:
     """
     Run full ML + agent pipeline for a given ticker.
     Returns final JSON report.
-    """
-    import pandas as pd
-    from datetime import date
-    from src.model_inference import predict_volatility
-    from src.report_builder import build_final_report
 
-    FEATURES = [
-        "log_return",
-        "vol_past",
-        "Volume",
-        "vol_percentile",
-        "vol_compression",
-        "trend_strength"
-    ]
+    model_out / news (+ news_filter) / report_date can be passed in when the caller has
+    already computed them (e.g. to build a cache key); they are not redone.
 
-    df = pd.read_parquet("data/processed/reliance_labeled.parquet")
+    deadline (src.deadline.Deadline) bounds every stage; overrunning stages
+    are skipped and the report is degraded instead of the request hanging.
+    """
+    from datetime import date
 
-    model_out = predict_volatility(ticker)
+    if model_out is None:
+        model_out = model_stage(ticker, deadline)
 
-    agent = build_agent()
+    agent = get_agent()
     state = agent.invoke({
         "ticker": ticker.upper(),
-        "date": date.today().isoformat(),
-        "news": [],
+        "date": report_date or date.today().isoformat(),
+        "news": news or [],
+        "news_fetched": news is not None,
+        "news_filter": news_filter or {},
+        "summarizer": summarizer,
+        "summary_budget_ms": summary_budget_ms,
         "summary": "",
         "risk_score": model_out["risk_score"],
         "risk_bucket": model_out["risk_bucket"],
+        "model_version": model_out.get("model_version", ""),
+        "as_of": str(model_out["date"])[:10] if model_out.get("date") else None,
+        "contributions": model_out["contributions"],
         "risk_type": "",
         "exogenous_shock": False,
         "context_alignment": "",
         "confidence_modifier": "",
-        "final_signal": ""
+        "final_signal": "",
+        "summary_degraded": False,
+        "deadline": deadline
     })
 
+    # Skipped stages mean less context behind the signal
+    if deadline is not None and deadline.degraded:
+        state["confidence_modifier"] = "decrease"
+
     return build_final_report(state)
 
 
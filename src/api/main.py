@@ -1,12 +1,29 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from src.api.routes import router
+from src.api.warmup import start_background_warmup, warmup_enabled
 from fastapi.middleware.cors import CORSMiddleware
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Optional: preload models + agent graph without delaying readiness
+    if warmup_enabled():
+        start_background_warmup()
+    yield
+
+    # Commit any reports still queued for the history store
+    from src.report_store import _STORE
+    if _STORE is not None:
+        _STORE.flush()
+
+
 app = FastAPI(
     title="Stock Volatility AI",
     description="ML + Agentic Volatility Risk System",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -18,6 +35,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Profile-Path"],
 )
 
 app.include_router(router)
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+# Seconds a client / CDN may reuse a response without revalidating.
+CACHE_MAX_AGE = int(os.getenv("RESPONSE_CACHE_MAX_AGE", "300"))
+
+# Optional shared local-disk backend (e.g. for several uvicorn workers).
+CACHE_DIR_ENV = "RESPONSE_CACHE_DIR"
+
+
+def news_window_hash(reference_date: str, headlines) -> str:
+    """
+    Stable hash of the news window a report was built from.
+    """
+    digest = hashlib.sha256(reference_date.encode())
+    for headline in sorted(headlines):
+        digest.update(b"\0" + headline.encode())
+    return digest.hexdigest()[:16]
+
+
+def make_key(ticker, bar_date, model_version, news_hash) -> str:
+    return f"{ticker}|{bar_date}|{model_version}|{news_hash}"
+
+
+def make_etag(body: str) -> str:
+    # Strong validator over the serialized bytes: the same key rebuilt
+    # later or in another worker (new generated_at, another LLM summary)
+    # is a different representation and gets a different ETag
+    return '"' + hashlib.sha256(body.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison: W/"x" matches "x"
+    return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+
+def cache_headers(etag: str) -> dict:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CACHE_MAX_AGE}, must-revalidate"
+    }
+
+
+class ResponseCache:
+    """
+    In-process LRU of serialized responses, with an optional shared
+    local-disk backend. Entries are dicts:
+    {key, scope, etag, body, created_at}.
+    """
+
+    def __init__(self, maxsize=256, disk_dir=None, disk_max_entries=10_000,
+                 disk_prune_every=None):
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self.disk_max_entries = disk_max_entries
+        # Listing the directory is O(files), so it runs once per
+        # disk_prune_every writes; the disk may overshoot the cap by that much
+        self.disk_prune_every = disk_prune_every or max(1, disk_max_entries // 10)
+        self._disk_writes = 0
+
+        self._entries = OrderedDict()
+        self._latest = {}  # scope (e.g. ticker) -> key of its most recent entry
+        self._lock = threading.Lock()
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # -----------------------------
+    # Lookup
+    # -----------------------------
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = self._disk_get(key)
+        if entry is not None:
+            self._remember(entry)
+        return entry
+
+    def fresh(self, scope, max_age=CACHE_MAX_AGE):
+        """
+        Latest entry for a scope (ticker + request variant) if it is younger
+        than max_age seconds. Lets revalidation skip the market-data and
+        news fetches entirely.
+        """
+        with self._lock:
+            key = self._latest.get(scope)
+            entry = self._entries.get(key) if key else None
+
+        if entry is None or time.time() - entry["created_at"] > max_age:
+            return None
+        return entry
+
+    # -----------------------------
+    # Store
+    # -----------------------------
+    def put(self, key, body, scope=None):
+        serialized = json.dumps(body, separators=(",", ":"))
+        entry = {
+            "key": key,
+            "scope": scope or key.split("|", 1)[0],
+            "etag": make_etag(serialized),
+            "body": serialized,
+            "created_at": time.time()
+        }
+
+        self._remember(entry)
+        self._disk_put(entry)
+        return entry
+
+    def _remember(self, entry):
+        with self._lock:
+            self._entries[entry["key"]] = entry
+            self._entries.move_to_end(entry["key"])
+            scope = entry.get("scope") or entry["key"].split("|", 1)[0]
+            self._latest[scope] = entry["key"]
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    # -----------------------------
+    # Disk backend
+    # -----------------------------
+    def _disk_path(self, key):
+        name = hashlib.sha256(key.encode()).hexdigest() + ".json"
+        return os.path.join(self.disk_dir, name)
+
+    def _disk_get(self, key):
+        if not self.disk_dir:
+            return None
+
+        try:
+            with open(self._disk_path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        return entry if entry.get("key") == key else None
+
+    def _disk_put(self, entry):
+        if not self.disk_dir:
+            return
+
+        path = self._disk_path(entry["key"])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+
+        # Atomic replace so concurrent workers never read a partial file
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            # The first write also prunes whatever a previous run left behind
+            due = self._disk_writes % self.disk_prune_every == 0
+            self._disk_writes += 1
+        if due:
+            self._disk_prune()
+
+    def _disk_prune(self):
+        files = []
+        with os.scandir(self.disk_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    files.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass  # removed by another worker meanwhile
+
+        if len(files) <= self.disk_max_entries:
+            return
+
+        files.sort()
+        for _, path in files[:len(files) - self.disk_max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+response_cache = ResponseCache(disk_dir=os.getenv(CACHE_DIR_ENV) or None)
@@ -0,0 +1,154 @@
+import io
+import json
+
+from src.report_store import RISK_TABLE_COLUMNS
+
+
+# -----------------------------
+# Universe risk table encoders
+# -----------------------------
+# /risk/table streams the latest row per ticker as JSON, an Arrow IPC
+# stream or Parquet. Each encoder consumes batches of row tuples from
+# ReportStore.risk_table() and yields bytes as soon as a batch is
+# encoded, so the full table is never materialised. The Arrow and
+# Parquet encoders build columns from each batch directly; no per-row
+# dicts or JSON.
+JSON_TYPE = "application/json"
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_TYPE = "application/vnd.apache.parquet"
+
+MEDIA_TYPES = {
+    "json": JSON_TYPE,
+    "arrow": ARROW_TYPE,
+    "parquet": PARQUET_TYPE,
+}
+
+# Accept header values -> format
+_ACCEPT_ALIASES = {
+    JSON_TYPE: "json",
+    ARROW_TYPE: "arrow",
+    "application/vnd.apache.arrow.file": "arrow",
+    PARQUET_TYPE: "parquet",
+    "application/x-parquet": "parquet",
+    "*/*": "json",
+    "application/*": "json",
+}
+
+
+def negotiate_format(accept, requested=None) -> str:
+    """
+    Pick the output format from an explicit ?format= or the Accept header
+    (highest q-value first). Raises ValueError if nothing acceptable.
+    """
+    if requested:
+        if requested not in MEDIA_TYPES:
+            raise ValueError(
+                f"Unknown format '{requested}'. Available: {sorted(MEDIA_TYPES)}"
+            )
+        return requested
+
+    if not accept:
+        return "json"
+
+    candidates = []
+    for i, part in enumerate(accept.split(",")):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0 and media_type.lower() in _ACCEPT_ALIASES:
+            candidates.append((-q, i, _ACCEPT_ALIASES[media_type.lower()]))
+
+    if not candidates:
+        raise ValueError(
+            f"Not acceptable: '{accept}'. Supported: {sorted(MEDIA_TYPES.values())}"
+        )
+
+    return min(candidates)[2]
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("ticker", pa.string()),
+        ("as_of", pa.string()),
+        ("risk_score", pa.float64()),
+        ("risk_bucket", pa.string()),
+        ("model_version", pa.string()),
+        ("generated_at", pa.string()),
+    ])
+
+
+def _record_batch(rows, schema):
+    import pyarrow as pa
+
+    columns = list(zip(*rows))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema
+    )
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+
+def stream_json(batches):
+    yield b'{"columns":' + json.dumps(RISK_TABLE_COLUMNS).encode() + b',"items":['
+
+    first = True
+    for rows in batches:
+        chunk = ",".join(
+            json.dumps(dict(zip(RISK_TABLE_COLUMNS, row)), separators=(",", ":"))
+            for row in rows
+        )
+        yield (chunk if first else "," + chunk).encode()
+        first = False
+
+    yield b"]}"
+
+
+def stream_arrow(batches):
+    import pyarrow as pa
+
+    schema = _arrow_schema()
+    sink = io.BytesIO()
+
+    with pa.ipc.new_stream(sink, schema) as writer:
+        yield _drain(sink)  # schema message
+
+        for rows in batches:
+            writer.write_batch(_record_batch(rows, schema))
+            yield _drain(sink)
+
+    yield _drain(sink)  # end-of-stream marker
+
+
+def stream_parquet(batches):
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema()
+    sink = io.BytesIO()
+
+    # One row group per batch; the footer is written on close
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in batches:
+            writer.write_batch(_record_batch(rows, schema))
+            yield _drain(sink)
+
+    yield _drain(sink)
+
+
+ENCODERS = {
+    "json": stream_json,
+    "arrow": stream_arrow,
+    "parquet": stream_parquet,
+}
@@ -1,14 +1,201 @@
-from fastapi import APIRouter, Query
-from src.agentic_context import run_pipeline  # we’ll create this wrapper
+import os
+import sys
+
+from fastapi import APIRouter, Query, Header, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from src.api.warmup import warmup_status
+from src.profiling import maybe_profile, profiling_enabled
+from src.report_store import get_report_store
+from src.api.response_cache import (
+    response_cache,
+    cache_headers,
+    etag_matches,
+    make_key,
+    news_window_hash
+)
 
 router = APIRouter()
 
 from fastapi import HTTPException
 
+
+@router.get("/health")
+def health():
+    # Models are only listed once loaded (warmup, preload or first request),
+    # so this stays cheap and does not import the pipeline itself
+    model_inference = sys.modules.get("src.model_inference")
+    models = model_inference.loaded_models() if model_inference else {}
+    deadline = sys.modules.get("src.deadline")
+
+    return {
+        "status": "ok",
+        "pid": os.getpid(),
+        "models": models,
+        "stage_workers": deadline.stage_work_in_flight() if deadline else None,
+        "warmup": warmup_status()
+    }
+
+
+@router.get("/metrics/drift")
+def drift_metrics():
+    from src.drift_monitor import get_drift_monitor
+
+    return get_drift_monitor().report()
+
+
 @router.get("/analyze")
-def analyze_stock(ticker: str):
+def analyze_stock(
+    ticker: str,
+    summarizer: str = "auto",
+    if_none_match: str | None = Header(default=None),
+    x_profile: str | None = Header(default=None)
+):
+    # Opt-in profiling (X-Profile: 1 or PROFILE=1); a plain call otherwise
+    if not profiling_enabled(x_profile):
+        return _analyze(ticker, summarizer, if_none_match)
+
+    with maybe_profile(f"analyze-{ticker.upper()}", enabled=True) as profiler:
+        response = _analyze(ticker, summarizer, if_none_match)
+
+    response.headers["X-Profile-Path"] = profiler.path
+    return response
+
+
+def _analyze(ticker, summarizer, if_none_match):
+    # Pipeline (pandas, models, agent) is imported on first analysis
+    from datetime import date
+    from src.agentic_context import run_pipeline, model_stage, news_stage
+    from src.deadline import Deadline, StageOverloaded, StageTimeout
+    from src.summarizers import choose_summarizer
+
+    ticker = ticker.upper()
+    deadline = Deadline()
+
+    try:
+        choose_summarizer(summarizer)  # validate before any fetching
+
+        # Reports built by different summarizers are cached separately
+        scope = f"{ticker}|{summarizer}"
+        entry = response_cache.fresh(scope)
+
+        if entry is None:
+            # Cache key: (ticker, latest bar date, model version, news window)
+            model_out = model_stage(ticker, deadline)
+            report_date = date.today().isoformat()
+            news, news_filter = news_stage(ticker, report_date, deadline)
+
+            key = make_key(
+                ticker,
+                model_out["date"],
+                model_out["model_version"],
+                news_window_hash(report_date, news) + f":{summarizer}"
+            )
+
+            entry = None if deadline.degraded else response_cache.get(key)
+            if entry is None:
+                report = run_pipeline(
+                    ticker,
+                    model_out=model_out,
+                    news=news,
+                    news_filter=news_filter,
+                    report_date=report_date,
+                    summarizer=summarizer,
+                    deadline=deadline
+                )
+
+                # Persisted off the request path by the store's writer thread
+                get_report_store().add(report)
+
+                # Degraded reports are served once, never cached
+                if deadline.degraded:
+                    return JSONResponse(
+                        report, headers={"Cache-Control": "no-store"}
+                    )
+
+                entry = response_cache.put(key, report, scope=scope)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StageTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except StageOverloaded as e:
+        # Stage workers are all held by slow calls: shed load fast
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    headers = cache_headers(entry["etag"])
+
+    if etag_matches(if_none_match, entry["etag"]):
+        return Response(status_code=304, headers=headers)
+
+    return Response(
+        content=entry["body"],
+        media_type="application/json",
+        headers=headers
+    )
+
+
+@router.get("/risk/table")
+def risk_table(
+    bucket: list[str] | None = Query(None),
+    min_score: float | None = Query(None, ge=0, le=1),
+    max_score: float | None = Query(None, ge=0, le=1),
+    sort: str = "ticker",
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    format: str | None = None,
+    accept: str | None = Header(default=None)
+):
+    """
+    Latest risk_score / risk_bucket / as-of bar date / model version for every
+    ticker with a trained model. Tickers never analyzed are listed with
+    null values (and drop out under bucket / score filters). Format
+    follows ?format= or Accept: JSON, Arrow IPC stream or Parquet.
+    """
+    from src.api.risk_table import ENCODERS, MEDIA_TYPES, negotiate_format
+    from src.model_inference import trained_tickers
+    from src.report_store import RISK_TABLE_SORTS
+
     try:
-        return run_pipeline(ticker.upper())
+        fmt = negotiate_format(accept, format)
+    except ValueError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
+    if sort not in RISK_TABLE_SORTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown sort '{sort}'. Available: {sorted(RISK_TABLE_SORTS)}"
+        )
+
+    batches = get_report_store().risk_table(
+        tickers=trained_tickers(),
+        buckets=[b.lower() for b in bucket] if bucket else None,
+        min_score=min_score,
+        max_score=max_score,
+        sort=sort,
+        descending=order == "desc"
+    )
+
+    return StreamingResponse(
+        ENCODERS[fmt](batches),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Vary": "Accept"}
+    )
+
+
+@router.get("/reports/latest")
+def latest_reports(limit: int = Query(50, ge=1, le=500), cursor: str | None = None):
+    try:
+        return get_report_store().latest(limit=limit, cursor=cursor)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+
+@router.get("/reports/{ticker}")
+def report_history(
+    ticker: str,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None
+):
+    try:
+        return get_report_store().history(ticker, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
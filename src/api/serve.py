@@ -0,0 +1,255 @@
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+
+# -----------------------------
+# Multi-worker serving (pre-fork)
+# -----------------------------
+# `uvicorn --workers N` spawns fresh interpreters, so every worker
+# unpickles every model again. Here the master process imports the
+# pipeline and loads all models once, then forks N workers that serve
+# the same listening socket. The model objects (LightGBM trees live in
+# native memory) are shared copy-on-write instead of duplicated.
+#
+#   python -m src.api.serve --workers 4 --port 8000
+#
+# Nothing that starts threads or network clients (LLM client, report
+# store writer, warmup thread) runs before the fork; each worker creates
+# those lazily for itself.
+DEFAULT_WORKERS = int(os.getenv("API_WORKERS", "2"))
+
+
+def preload():
+    """
+    Load everything workers should share: heavy imports, every model,
+    drift references and the compiled agent graph. Returns the tickers
+    whose models were loaded. The contagion universe is not fetched here
+    (yfinance clients and a thread pool); see _start_worker.
+    """
+    import src.api.main  # noqa: F401  (app, routes, pandas)
+    from src.agentic_context import get_agent
+    from src.drift_monitor import get_drift_monitor
+    from src.model_inference import preload_models
+
+    tickers = preload_models()
+    get_drift_monitor().preload(tickers)
+    get_agent()
+
+    # Move everything allocated so far out of the GC's reach, so worker
+    # collections don't write to (and un-share) the preloaded pages
+    gc.collect()
+    gc.freeze()
+
+    return tickers
+
+
+def _bind(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _start_worker():
+    """
+    Per-worker setup after the fork: start the background fetch of the
+    contagion universe (its network clients and threads belong to this
+    worker). Requests don't wait for it; see model_inference.market_context.
+    """
+    from src.model_inference import market_context
+
+    market_context()
+
+
+def _run_worker(sock, log_level):
+    import uvicorn
+
+    # Workers are killed by the master; default handlers keep uvicorn's
+    # graceful shutdown on SIGTERM / SIGINT
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    config = uvicorn.Config("src.api.main:app", log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(host="127.0.0.1", port=8000, workers=DEFAULT_WORKERS,
+          preload_models=True, log_level="info"):
+    """
+    Fork `workers` uvicorn processes over one socket. With preload_models
+    the master loads models before forking; otherwise each worker loads
+    its own copy (the `uvicorn --workers` behaviour, for comparison).
+    """
+    if preload_models:
+        start = time.perf_counter()
+        tickers = preload()
+        print(
+            f"Preloaded {len(tickers)} models in "
+            f"{time.perf_counter() - start:.2f} s (pid {os.getpid()})"
+        )
+
+    sock = _bind(host, port)
+    children = []
+
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                if not preload_models:
+                    from src.model_inference import preload_models as load_all
+                    load_all()
+                _start_worker()
+                _run_worker(sock, log_level)
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    print(f"Serving on http://{host}:{port} with {workers} workers: {children}")
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for pid in children:
+        while True:
+            try:
+                os.waitpid(pid, 0)
+                break
+            except InterruptedError:
+                continue
+            except ChildProcessError:
+                break
+
+    sock.close()
+
+
+# -----------------------------
+# Memory benchmark
+# -----------------------------
+def process_memory_kb(pid) -> dict:
+    """
+    RSS and PSS of a process from /proc/<pid>/smaps_rollup (Linux).
+    PSS splits shared pages between the processes sharing them, so the
+    sum of PSS over workers is their real combined footprint.
+    """
+    memory = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in {"Rss", "Pss"}:
+                memory[name.lower()] = int(rest.split()[0])
+    return memory
+
+
+def _children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def _wait_healthy(port, n_workers, timeout=120.0):
+    import json
+    import urllib.request
+
+    start = time.perf_counter()
+    seen = set()
+
+    # Hit /health until every worker has answered with its models loaded
+    while time.perf_counter() - start < timeout:
+        try:
+            with urllib.request.urlopen(
+                f"http://127.0.0.1:{port}/health", timeout=1
+            ) as response:
+                body = json.loads(response.read())
+                if body["models"]:
+                    seen.add(body["pid"])
+        except OSError:
+            time.sleep(0.05)
+
+        if len(seen) >= n_workers:
+            return
+
+    raise TimeoutError("Workers did not become healthy in time")
+
+
+def _measure(workers, preload_models, port):
+    import subprocess
+
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "src.api.serve",
+            "--workers", str(workers), "--port", str(port),
+            "--log-level", "warning"
+        ] + ([] if preload_models else ["--no-preload"]),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+    try:
+        _wait_healthy(port, workers)
+        time.sleep(0.5)
+
+        worker_memory = [process_memory_kb(pid) for pid in _children(server.pid)]
+        master = process_memory_kb(server.pid)
+        return master, worker_memory
+
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def memory_benchmark(worker_counts=(1, 2, 4), port=8766):
+    print("===== MULTI-WORKER MEMORY (MB) =====")
+    print(f"{'mode':<10} {'workers':>7} {'rss/worker':>11} {'pss/worker':>11} {'total pss':>10}")
+
+    for preload_models in (False, True):
+        mode = "preload" if preload_models else "per-worker"
+
+        for workers in worker_counts:
+            master, worker_memory = _measure(workers, preload_models, port)
+
+            rss = sum(m["rss"] for m in worker_memory) / len(worker_memory) / 1024
+            pss = sum(m["pss"] for m in worker_memory) / len(worker_memory) / 1024
+            total = (master["pss"] + sum(m["pss"] for m in worker_memory)) / 1024
+
+            print(f"{mode:<10} {workers:>7} {rss:>11.1f} {pss:>11.1f} {total:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-fork multi-worker API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument(
+        "--no-preload", action="store_true",
+        help="load models in each worker instead of once before forking"
+    )
+    parser.add_argument(
+        "--memory-benchmark", action="store_true",
+        help="report per-worker RSS/PSS for 1, 2 and 4 workers"
+    )
+    args = parser.parse_args()
+
+    if args.memory_benchmark:
+        memory_benchmark()
+    else:
+        serve(
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            preload_models=not args.no_preload,
+            log_level=args.log_level
+        )
@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+
+
+# Set WARMUP_ON_STARTUP=1 to preload models and compile the agent graph
+# in a background thread as soon as the API starts.
+WARMUP_ENV = "WARMUP_ON_STARTUP"
+
+_STATUS = {
+    "state": "idle",       # idle -> running -> done | failed
+    "models_loaded": [],
+    "agent_compiled": False,
+    "market_context": False,
+    "seconds": None,
+    "error": None
+}
+_LOCK = threading.Lock()
+
+
+def warmup_enabled() -> bool:
+    return os.getenv(WARMUP_ENV, "0").lower() in {"1", "true", "yes"}
+
+
+def warmup():
+    """
+    Preload the model registry and heavy dependencies, compile the
+    agent graph, then fetch the universe for the contagion features.
+    Safe to call more than once.
+    """
+    from src.model_inference import preload_models, refresh_market_context
+    from src.agentic_context import get_agent
+
+    start = time.perf_counter()
+    _STATUS["state"] = "running"
+
+    try:
+        _STATUS["models_loaded"] = preload_models()
+
+        import yfinance  # noqa: F401  (first fetch would pay this otherwise)
+
+        get_agent()
+        _STATUS["agent_compiled"] = True
+
+        # Until this succeeds requests score with NaN contagion features;
+        # a failed fetch is retried in the background, not fatal here
+        _STATUS["market_context"] = refresh_market_context()
+        _STATUS["state"] = "done"
+
+    except Exception as e:
+        _STATUS["state"] = "failed"
+        _STATUS["error"] = f"{type(e).__name__}: {e}"
+
+    finally:
+        _STATUS["seconds"] = round(time.perf_counter() - start, 3)
+
+    return warmup_status()
+
+
+def start_background_warmup():
+    """
+    Run warmup() on a daemon thread so startup is not blocked.
+    """
+    with _LOCK:
+        if _STATUS["state"] in {"running", "done"}:
+            return None
+
+        _STATUS["state"] = "running"
+        thread = threading.Thread(target=warmup, name="api-warmup", daemon=True)
+        thread.start()
+
+    return thread
+
+
+def warmup_status() -> dict:
+    return dict(_STATUS)
+
+
+# -----------------------------
+# Cold-start benchmark
+# -----------------------------
+def _measure_import(module="src.api.main", runs=5):
+    import statistics
+    import subprocess
+    import sys
+
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {module}; "
+        "print(time.perf_counter() - t)"
+    )
+
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True, text=True, check=True
+        )
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+
+    return statistics.median(timings)
+
+
+def _measure_first_healthy(port, warm, timeout=60.0):
+    import subprocess
+    import sys
+    import urllib.request
+
+    env = dict(os.environ, **{WARMUP_ENV: "1" if warm else "0"})
+
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "src.api.main:app",
+            "--port", str(port), "--log-level", "warning"
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(
+                    f"http://127.0.0.1:{port}/health", timeout=1
+                ) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.02)
+
+        raise TimeoutError("API did not become healthy in time")
+
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    print("===== API COLD START =====")
+    print(f"import src.api.main (median): {_measure_import():.3f} s")
+    print(f"import src.agentic_context:   {_measure_import('src.agentic_context'):.3f} s")
+
+    for warm in (False, True):
+        seconds = _measure_first_healthy(port=8765, warm=warm)
+        label = "with warmup" if warm else "no warmup"
+        print(f"time to first /health ({label}): {seconds:.3f} s")
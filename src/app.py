@@ -1,13 +1,24 @@
 from flask import Flask, jsonify
 from dotenv import load_dotenv
 import os
-from google import genai
 
 # Load environment variables
 load_dotenv()
 
-# Create Gemini client
-client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+# Gemini client is created on first request, not at import time
+_client = None
+
+
+def get_client():
+    global _client
+
+    if _client is None:
+        from google import genai
+
+        _client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+
+    return _client
+
 
 app = Flask(__name__)
 
@@ -17,7 +28,7 @@ def home():
 
 @app.route("/ask", methods=["GET"])
 def ask_gemini():
-    response = client.models.generate_content(
+    response = get_client().models.generate_content(
         model="gemini-2.5-flash",
         contents="How are you?"
     )
@@ -0,0 +1,323 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+
+# -----------------------------
+# Historical backfill of final reports
+# -----------------------------
+# For every (ticker, trading day) in a range, rebuild the report the
+# system would have produced that day:
+#   - features are computed on bars up to that day only (all features
+#     are backward-looking rolling windows, so one pass over the full
+#     history gives every day's point-in-time row, scored in one
+#     pred_contrib call per ticker)
+#   - headlines come from a local archive, using the live fetcher's
+#     window (reference day - 3 days .. end of reference day)
+#   - summaries come from a summary cache, else the offline extractive
+#     summarizer (no network)
+#   - scores are walk-forward: the range is cut into periods of
+#     REFIT_EVERY_DAYS bars, and each period is scored by a model and
+#     calibration table trained only on bars whose labels were known
+#     before it (the same training and out-of-fold calibration code as
+#     train_all_models). The served model file is never used: it has
+#     seen the whole history, so every backfilled day would be
+#     in-sample. Each row records the walk-forward model that scored it.
+#
+# Work is split per ticker across a process pool; each finished ticker
+# is checkpointed as a part file, so an interrupted run resumes where it
+# stopped. Parts are merged into one Parquet file at the end.
+
+NEWS_WINDOW_DAYS = 3
+REFIT_EVERY_DAYS = 63    # bars per walk-forward period (about a quarter)
+MIN_TRAIN_ROWS = 500     # labelled bars needed before a period is scored
+
+
+def load_news_archive(path):
+    """
+    Local headline archive: JSONL or Parquet with ticker, published, title.
+    """
+    if path is None:
+        return pd.DataFrame(columns=["ticker", "published", "title"])
+
+    if path.endswith(".parquet"):
+        archive = pd.read_parquet(path)
+    else:
+        archive = pd.read_json(path, lines=True)
+
+    archive["ticker"] = archive["ticker"].str.upper().str.replace(".NS", "", regex=False)
+    archive["published"] = pd.to_datetime(archive["published"], utc=True).dt.tz_localize(None)
+    return archive.sort_values("published").reset_index(drop=True)
+
+
+def archived_headlines(ticker_news, reference_date):
+    """
+    Headlines in the live fetcher's window, from one ticker's archive
+    slice (sorted by published).
+    """
+    ref = datetime.strptime(reference_date, "%Y-%m-%d")
+    start, end = ref - timedelta(days=NEWS_WINDOW_DAYS), ref + timedelta(days=1)
+
+    published = ticker_news["published"].to_numpy()
+    lo = published.searchsorted(pd.Timestamp(start).to_datetime64(), side="left")
+    hi = published.searchsorted(pd.Timestamp(end).to_datetime64(), side="right")
+    return ticker_news["title"].iloc[lo:hi].tolist()
+
+
+def load_prices(ticker, prices_dir=None):
+    if prices_dir:
+        path = os.path.join(prices_dir, f"{ticker}.parquet")
+        if os.path.exists(path):
+            return pd.read_parquet(path)
+
+    from src.data_ingestion import fetch_nse_data
+
+    return fetch_nse_data(ticker, verbose=True)
+
+
+def walk_forward_scores(df, labelled, refit_every=REFIT_EVERY_DAYS):
+    """
+    Point-in-time scores for the feature rows in df (sorted by Date).
+    Each block of refit_every rows is scored by a model and calibration
+    table fitted on the labelled rows before it, minus the last
+    FUTURE_WINDOW (their labels look into the block). Blocks with fewer
+    than MIN_TRAIN_ROWS such rows, or a single class, are left unscored.
+
+    Returns (raw, calibrated, buckets, contributions, model ids, trained
+    through) aligned with df; unscored rows are NaN / None.
+    """
+    import numpy as np
+
+    from src.calibration import apply_calibration
+    from src.explainability import compute_contributions
+    from src.label_generation import FUTURE_WINDOW
+    from src.train_all_models import fit_out_of_fold_calibration
+    from src.tree_model import FEATURES, TARGET, train_lightgbm_model
+
+    n = len(df)
+    raw = np.full(n, np.nan)
+    calibrated = np.full(n, np.nan)
+    buckets = [None] * n
+    contributions = pd.DataFrame(np.nan, index=df.index, columns=FEATURES)
+    model_ids = [None] * n
+    trained_through = [None] * n
+
+    for lo in range(0, n, refit_every):
+        block = df.iloc[lo:lo + refit_every]
+        train = labelled[labelled["Date"] < block["Date"].iloc[0]]
+        train = train.iloc[:max(len(train) - FUTURE_WINDOW, 0)]
+
+        if len(train) < MIN_TRAIN_ROWS or train[TARGET].nunique() < 2:
+            print(
+                f"⏭ {block['Date'].iloc[0]:%Y-%m-%d}: {len(train)} labelled bars "
+                "before the period; left unscored"
+            )
+            continue
+
+        model = train_lightgbm_model(train)
+        calibration = fit_out_of_fold_calibration(train)
+
+        probabilities, block_contributions, _ = compute_contributions(model, block[FEATURES])
+        scores, block_buckets = apply_calibration(calibration, probabilities)
+
+        through = train["Date"].max().strftime("%Y-%m-%d")
+        rows = slice(lo, lo + len(block))
+        raw[rows] = probabilities
+        calibrated[rows] = scores
+        buckets[rows] = [str(b) for b in block_buckets]
+        contributions.iloc[rows] = block_contributions.to_numpy()
+        model_ids[rows] = [f"walkforward-{through}"] * len(block)
+        trained_through[rows] = [through] * len(block)
+
+    return raw, calibrated, buckets, contributions, model_ids, trained_through
+
+
+def backfill_ticker(ticker, start, end, news_archive_path=None,
+                    summary_cache_path=None, prices_dir=None,
+                    refit_every=REFIT_EVERY_DAYS):
+    """
+    All reports for one ticker between start and end (inclusive), scored
+    walk-forward (see walk_forward_scores). Returns a DataFrame with one
+    row per scored trading day.
+    """
+    from src.agentic_context import classify_context, reconcile_signal
+    from src.api.response_cache import news_window_hash
+    from src.feature_graph import compute_features
+    from src.market_features import add_contagion_features, universe_features
+    from src.model_inference import FEATURE_SET, FEATURES, SUPPORTED_TICKERS
+    from src.news_filter import filter_headlines
+    from src.report_builder import build_final_report
+    from src.summarizers import extractive_summarize
+    from src.train_all_models import build_training_frame
+
+    archive = load_news_archive(news_archive_path)
+    ticker_news = archive[archive["ticker"] == ticker].reset_index(drop=True)
+
+    summary_cache = {}
+    if summary_cache_path and os.path.exists(summary_cache_path):
+        with open(summary_cache_path) as f:
+            summary_cache = json.load(f)
+
+    # Same universe as serving, so contagion features match live scores
+    frames = {t: load_prices(t, prices_dir) for t in sorted(SUPPORTED_TICKERS)}
+    prices = frames[ticker] if ticker in frames else load_prices(ticker, prices_dir)
+    universe = universe_features(frames)
+
+    # Features + labels for training, features alone for scoring
+    labelled = build_training_frame(prices, ticker, universe)
+    df = add_contagion_features(prices, ticker, universe)
+    df = compute_features(df, FEATURES, feature_set=FEATURE_SET)
+    df = df.dropna(subset=FEATURES)
+    df = df[(df["Date"] >= start) & (df["Date"] <= end)].reset_index(drop=True)
+
+    if df.empty:
+        return pd.DataFrame()
+
+    _, risk_scores, risk_buckets, contributions, model_ids, trained_through = (
+        walk_forward_scores(df, labelled, refit_every)
+    )
+
+    rows = []
+    for i, bar in df.iterrows():
+        if model_ids[i] is None:
+            continue
+
+        day = bar["Date"].strftime("%Y-%m-%d")
+        risk_score = float(risk_scores[i])
+
+        raw = archived_headlines(ticker_news, day)
+        news, news_filter = filter_headlines(raw, ticker, max_items=8)
+
+        if not news:
+            summary, summarizer = (
+                f"No time-aligned news was found around {day} "
+                f"to explain volatility in {ticker}. "
+                "The volatility signal may be driven by endogenous market dynamics."
+            ), "none"
+        else:
+            cached = summary_cache.get(news_window_hash(day, news))
+            if cached is not None:
+                summary, summarizer = cached, "cache"
+            else:
+                summary, summarizer = extractive_summarize(ticker, day, news), "extractive"
+
+        state = {
+            "ticker": ticker,
+            "date": day,
+            "news": news,
+            "news_filter": news_filter,
+            "summary": summary,
+            "summarizer": summarizer,
+            "risk_score": risk_score,
+            "risk_bucket": risk_buckets[i],
+            "model_version": model_ids[i],
+            "as_of": day,
+            "contributions": {
+                feature: round(float(value), 6)
+                for feature, value in contributions.iloc[i].items()
+            },
+        }
+        state = reconcile_signal(classify_context(state))
+        report = build_final_report(state)
+
+        rows.append({
+            "ticker": ticker,
+            "date": day,
+            "risk_score": round(risk_score, 6),
+            "risk_bucket": state["risk_bucket"],
+            "model_version": model_ids[i],
+            "trained_through": trained_through[i],
+            "risk_type": state["risk_type"],
+            "exogenous_shock": state["exogenous_shock"],
+            "final_signal": state["final_signal"],
+            "summarizer": summarizer,
+            "news_count": len(news),
+            "report": json.dumps(report, separators=(",", ":"))
+        })
+
+    return pd.DataFrame(rows)
+
+
+def _part_path(out_path, ticker):
+    return os.path.join(f"{out_path}.parts", f"{ticker}.parquet")
+
+
+def _run_part(ticker, out_path, **kwargs):
+    frame = backfill_ticker(ticker, **kwargs)
+
+    part = _part_path(out_path, ticker)
+    tmp = f"{part}.tmp"
+    frame.to_parquet(tmp, index=False)
+    os.replace(tmp, part)  # a part only exists once it is complete
+
+    return ticker, len(frame)
+
+
+def run_backfill(tickers, start, end, out_path, workers=None, **kwargs):
+    """
+    Backfill tickers in parallel with per-ticker checkpoints, then write
+    the merged Parquet file. Already-finished tickers are skipped.
+    """
+    os.makedirs(f"{out_path}.parts", exist_ok=True)
+
+    tickers = [t.upper() for t in tickers]
+    pending = [t for t in tickers if not os.path.exists(_part_path(out_path, t))]
+
+    if len(pending) < len(tickers):
+        print(f"Resuming: {len(tickers) - len(pending)} tickers already done")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_run_part, t, out_path, start=start, end=end, **kwargs): t
+            for t in pending
+        }
+        for future in as_completed(futures):
+            ticker, n_rows = future.result()
+            print(f"✅ {ticker}: {n_rows} reports")
+
+    parts = [
+        pd.read_parquet(_part_path(out_path, t)) for t in tickers
+    ]
+    parts = [p for p in parts if not p.empty]
+    merged = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+    merged.to_parquet(out_path, index=False)
+
+    print(f"🎯 Backfill written → {out_path} ({len(merged)} rows)")
+    return out_path
+
+
+if __name__ == "__main__":
+    from src.model_inference import SUPPORTED_TICKERS
+
+    parser = argparse.ArgumentParser(description="Backfill historical agent reports")
+    parser.add_argument("--tickers", nargs="*", default=sorted(SUPPORTED_TICKERS))
+    parser.add_argument("--start", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--end", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--out", default="data/backfill/reports.parquet")
+    parser.add_argument("--news-archive", default=None)
+    parser.add_argument("--summary-cache", default=None)
+    parser.add_argument("--prices-dir", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--refit-every", type=int, default=REFIT_EVERY_DAYS,
+        help="bars per walk-forward period (one model + calibration each)"
+    )
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+
+    run_backfill(
+        args.tickers,
+        args.start,
+        args.end,
+        args.out,
+        workers=args.workers,
+        news_archive_path=args.news_archive,
+        summary_cache_path=args.summary_cache,
+        prices_dir=args.prices_dir,
+        refit_every=args.refit_every
+    )
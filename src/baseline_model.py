@@ -70,8 +70,8 @@ def train_baseline(train_df, val_df, features, target):
 
 
 if __name__ == "__main__":
-    from split_and_checks import time_based_split
-    from regime_features import add_regime_features
+    from src.split_and_checks import time_based_split
+    from src.regime_features import add_regime_features
 
     # ----------------------------
     # Load persisted dataset
@@ -0,0 +1,151 @@
+import json
+import os
+
+import numpy as np
+
+from src.risk_utils import RISK_THRESHOLDS, bucket_risks
+
+
+# -----------------------------
+# Probability calibration
+# -----------------------------
+# Models are trained with class_weight="balanced", so predict_proba is a
+# ranking score, not a probability. At training time a monotone map from
+# raw score to observed expansion frequency is fitted on walk-forward
+# out-of-fold scores of the same model configuration (isotonic by
+# default, Platt as the smooth alternative; see src.train_all_models) and
+# saved next to the model as a small lookup table: knots (x = raw,
+# y = calibrated) plus the bucket thresholds. Inference is np.interp over the knots and
+# one searchsorted for the buckets, for one row or a whole backfill.
+METHODS = ("isotonic", "platt")
+PLATT_GRID = 101   # knots for the tabulated sigmoid
+_EPS = 1e-6
+
+# Models saved before calibration existed keep their historical
+# behaviour: raw scores, bucketed at 0.35 / 0.65
+UNCALIBRATED = {
+    "method": "none",
+    "x": [0.0, 1.0],
+    "y": [0.0, 1.0],
+    "thresholds": [0.35, 0.65]
+}
+
+
+def calibration_path(ticker: str, model_dir="models") -> str:
+    return os.path.join(model_dir, f"{ticker.upper()}.calibration.json")
+
+
+def _logit(p):
+    p = np.clip(p, _EPS, 1 - _EPS)
+    return np.log(p / (1 - p))
+
+
+def brier_score(p, y) -> float:
+    return float(np.mean((np.asarray(p) - np.asarray(y)) ** 2))
+
+
+def fit_calibration(raw, y, method="isotonic") -> dict:
+    """
+    Lookup table mapping raw model scores to calibrated probabilities,
+    fitted on out-of-sample (raw score, label) pairs.
+    """
+    from sklearn.isotonic import IsotonicRegression
+    from sklearn.linear_model import LogisticRegression
+
+    raw = np.asarray(raw, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+
+    if method == "isotonic":
+        iso = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds="clip").fit(raw, y)
+        # Only the corners of the fitted step function are kept
+        x_knots, y_knots = iso.X_thresholds_, iso.y_thresholds_
+
+    elif method == "platt":
+        platt = LogisticRegression(C=1e6).fit(_logit(raw)[:, None], y)
+        x_knots = np.linspace(0.0, 1.0, PLATT_GRID)
+        y_knots = platt.predict_proba(_logit(x_knots)[:, None])[:, 1]
+
+    else:
+        raise ValueError(f"Unknown calibration method '{method}'. Use one of {METHODS}")
+
+    return {
+        "method": method,
+        "x": np.round(x_knots, 6).tolist(),
+        "y": np.round(y_knots, 6).tolist(),
+        "thresholds": list(RISK_THRESHOLDS),
+        "n_samples": int(len(y)),
+        "positive_rate": round(float(y.mean()), 6) if len(y) else None
+    }
+
+
+def apply_calibration(table: dict, raw):
+    """
+    (calibrated probabilities, risk buckets) for an array of raw scores.
+    """
+    calibrated = np.interp(np.asarray(raw, dtype="float64"), table["x"], table["y"])
+    return calibrated, bucket_risks(calibrated, table["thresholds"])
+
+
+def save_calibration(ticker: str, table: dict, model_dir="models") -> str:
+    path = calibration_path(ticker, model_dir)
+    with open(path, "w") as f:
+        json.dump(table, f)
+    return path
+
+
+def load_calibration(ticker: str, model_dir="models") -> dict:
+    """
+    The ticker's lookup table, or UNCALIBRATED if none was saved.
+    """
+    path = calibration_path(ticker, model_dir)
+    if not os.path.exists(path):
+        return UNCALIBRATED
+    with open(path) as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    import time
+
+    # Scores from a "balanced" model: right ranking, inflated level
+    rng = np.random.default_rng(5)
+    n = 200_000
+    signal = rng.normal(0, 1, n)
+    y = rng.random(n) < 1 / (1 + np.exp(-(signal * 1.5 - 3.0)))      # ~10% positives
+    raw = 1 / (1 + np.exp(-(signal * 1.5)))                           # balanced-style scores
+
+    fit, holdout = slice(0, n // 2), slice(n // 2, n)
+
+    print("===== CALIBRATION =====")
+    print(f"positive rate: {y.mean():.3f}, mean raw score: {raw.mean():.3f}")
+    print(f"raw Brier: {brier_score(raw[holdout], y[holdout]):.4f}")
+
+    for method in METHODS:
+        table = fit_calibration(raw[fit], y[fit], method)
+        calibrated, buckets = apply_calibration(table, raw[holdout])
+        shares = {b: f"{(buckets == b).mean():.1%}" for b in ("low", "medium", "high")}
+        print(
+            f"{method:>9}: {len(table['x'])} knots, "
+            f"Brier {brier_score(calibrated, y[holdout]):.4f}, buckets {shares}"
+        )
+
+    def legacy_bucket(score):
+        # The per-score if/elif this replaces, without any calibration
+        if score >= 0.65:
+            return "high"
+        elif score >= 0.35:
+            return "medium"
+        return "low"
+
+    start = time.perf_counter()
+    apply_calibration(table, raw)
+    lookup_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    [legacy_bucket(score) for score in raw.tolist()]
+    loop_time = time.perf_counter() - start
+
+    print(
+        f"calibrate + bucket {n:,} scores: {lookup_time * 1000:.1f} ms "
+        f"(per-score if/elif bucketing alone: {loop_time * 1000:.1f} ms)"
+    )
@@ -1,8 +1,19 @@
-import yfinance as yf
 import pandas as pd
 from datetime import datetime
 
-def fetch_nse_data(symbol, start="2015-01-01", end=None):
+from src.data_quality import check_quality, summarize_report
+
+def fetch_nse_data(symbol, start="2015-01-01", end=None, quarantine=None, verbose=False):
+    """
+    Daily OHLCV bars for an NSE symbol, run through the data-quality gate.
+    The gate's report is attached as df.attrs["data_quality"]; rows failing
+    row-level checks are dropped when quarantine is on (default: the
+    DATA_QUALITY_QUARANTINE env flag). verbose prints a one-line summary
+    when the gate finds issues (training / backfill runs); the serving
+    path leaves the report on the frame for callers to inspect.
+    """
+    import yfinance as yf  # heavy; loaded on first fetch
+
     if end is None:
         end = datetime.today().strftime("%Y-%m-%d")
 
@@ -21,10 +32,15 @@ def fetch_nse_data(symbol, start="2015-01-01", end=None):
     df.sort_values('Date', inplace=True)
     df.reset_index(drop=True, inplace=True)
 
+    df, report = check_quality(df, quarantine=quarantine)
+    if verbose and not report["passed"]:
+        print(f"{symbol}: {summarize_report(report)}")
+    df.attrs["data_quality"] = report
+
     return df
 
 
 if __name__ == "__main__":
-    df = fetch_nse_data("RELIANCE")
+    df = fetch_nse_data("RELIANCE", verbose=True)
     print(df.head())
     print(df.tail())
@@ -0,0 +1,316 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# Data-quality gate (ingestion / panels)
+# -----------------------------
+# Every check is one vectorized pass over the frame, producing a boolean
+# row mask. A single-ticker frame and a long-format panel (Ticker, Date,
+# sorted by Ticker then Date) go through the same code; "previous row"
+# comparisons are masked at ticker boundaries.
+#
+# Row-level problems (duplicates, bad volume, inconsistent OHLC, missing
+# values, bars on non-sessions) can be quarantined, i.e. dropped before
+# features are built. Gaps and split-like jumps are reported only:
+# dropping rows would not repair them.
+TICKER_COL = "Ticker"
+
+# NSE sessions are weekdays minus exchange holidays. Holidays come from
+# an optional CSV (one date per line / a "date" column); without it every
+# weekday is a session, so gaps of up to two missing weekdays are
+# tolerated as likely holidays (NSE rarely closes more than two weekdays
+# in a row, e.g. back-to-back festival days); only longer gaps are reported.
+HOLIDAYS_PATH = os.getenv("NSE_HOLIDAYS_PATH")
+GAP_TOLERANCE = 0 if HOLIDAYS_PATH else 2
+
+# Close / previous Close (or its inverse); NSE circuit limits cap genuine
+# daily moves at 20%, so a jump this large is almost always a split or bonus
+SPLIT_JUMP = 1.5
+
+QUARANTINE_ENV = "DATA_QUALITY_QUARANTINE"
+QUARANTINE_CHECKS = [
+    "duplicate_date",
+    "missing_values",
+    "non_positive_volume",
+    "ohlc_inconsistent",
+    "off_calendar",
+]
+REPORT_CHECKS = [
+    "calendar_gap",
+    "split_like_jump",
+]
+MAX_EXAMPLES = 5
+
+
+def quarantine_enabled() -> bool:
+    return os.getenv(QUARANTINE_ENV, "0").lower() in {"1", "true", "yes"}
+
+
+def load_holidays(path=HOLIDAYS_PATH):
+    if not path or not os.path.exists(path):
+        return []
+    holidays = pd.read_csv(path)
+    column = "date" if "date" in holidays.columns else holidays.columns[0]
+    return pd.to_datetime(holidays[column]).tolist()
+
+
+def exchange_calendar(holidays=None) -> np.busdaycalendar:
+    """
+    NSE session calendar: Monday-Friday minus holidays.
+    """
+    if holidays is None:
+        holidays = load_holidays()
+    return np.busdaycalendar(
+        holidays=np.asarray(pd.to_datetime(holidays)).astype("datetime64[D]")
+    )
+
+
+def _sorted(df):
+    if TICKER_COL in df.columns:
+        df = df.sort_values([TICKER_COL, "Date"], kind="stable")
+    else:
+        df = df.sort_values("Date", kind="stable")
+    return df.reset_index(drop=True)
+
+
+def _days(dates) -> np.ndarray:
+    """
+    datetime64 values as int64 days since the epoch.
+    """
+    unit, _ = np.datetime_data(dates.dtype)
+    per_day = np.timedelta64(1, "D") // np.timedelta64(1, unit)
+    return dates.view("int64") // per_day
+
+
+def _layout(df, days):
+    """
+    (starts, tickers): first row of each ticker and its label. A frame
+    without a Ticker column is one group. None if the frame is not in
+    (Ticker, Date) order.
+    """
+    n = len(df)
+
+    if TICKER_COL in df.columns and n:
+        labels = df[TICKER_COL].values
+        starts = np.flatnonzero(np.r_[True, np.asarray(labels[1:] != labels[:-1])])
+        tickers = [str(t) for t in labels[starts]]
+        if len(set(tickers)) != len(tickers):
+            return None  # a ticker's rows are not contiguous
+    else:
+        starts = np.zeros(min(n, 1), dtype="int64")
+        tickers = [None] * len(starts)
+
+    # Dates may only go backwards where a new ticker starts
+    backwards = np.flatnonzero(days[1:] < days[:-1]) + 1
+    if not np.isin(backwards, starts).all():
+        return None
+
+    return starts, tickers
+
+
+def _vs_previous(has_prev, current, previous, compare):
+    """
+    compare(row, previous row of the same ticker) as a row mask.
+    """
+    out = np.zeros(len(has_prev), dtype=bool)
+    with np.errstate(invalid="ignore"):
+        out[1:] = compare(current, previous)
+    return out & has_prev
+
+
+def check_quality(df, quarantine=None, holidays=None, gap_tolerance=GAP_TOLERANCE):
+    """
+    Run every check on an OHLCV frame or panel.
+
+    Returns (frame, report). With quarantine (default: the
+    DATA_QUALITY_QUARANTINE env flag) rows failing a QUARANTINE_CHECKS
+    check are dropped from the returned frame; otherwise it is returned
+    unchanged. Checks whose columns are absent are skipped.
+    """
+    if quarantine is None:
+        quarantine = quarantine_enabled()
+
+    days = _days(df["Date"].to_numpy())
+    layout = _layout(df, days)
+    if layout is None:
+        df = _sorted(df)
+        days = _days(df["Date"].to_numpy())
+        layout = _layout(df, days)
+    starts, tickers = layout
+
+    n = len(df)
+    has_prev = np.ones(n, dtype=bool)
+    has_prev[starts] = False
+    columns = set(df.columns)
+    flags = {}
+
+    # Duplicate (ticker, date): equal to the previous row of the same ticker
+    flags["duplicate_date"] = _vs_previous(has_prev, days[1:], days[:-1], np.equal)
+
+    values = {
+        name: df[name].to_numpy(dtype="float64")
+        for name in ("Open", "High", "Low", "Close", "Volume") if name in columns
+    }
+    # NaN in any column propagates through the sum
+    flags["missing_values"] = np.isnan(sum(values.values())) if values else np.zeros(n, dtype=bool)
+
+    if "Volume" in values:
+        flags["non_positive_volume"] = values["Volume"] <= 0
+
+    if {"Open", "High", "Low", "Close"} <= columns:
+        o, h, l, c = (values[name] for name in ("Open", "High", "Low", "Close"))
+        # High must bound Open/Close from above and Low from below (which
+        # implies High >= Low); Low <= 0 then covers any non-positive price
+        with np.errstate(invalid="ignore"):
+            flags["ohlc_inconsistent"] = (
+                (h < np.maximum(o, c)) | (l > np.minimum(o, c)) | (l <= 0)
+            )
+
+    # Calendar, evaluated once per calendar day in range (a panel repeats
+    # the same few thousand dates) and gathered back to rows:
+    # session_number[d] = sessions strictly before day d
+    calendar = exchange_calendar(holidays)
+    missing = np.zeros(n, dtype="int64")
+    flags["off_calendar"] = np.zeros(n, dtype=bool)
+
+    if n:
+        first = days.min()
+        span = np.arange(first, days.max() + 1).astype("datetime64[D]")
+        session_number = np.busday_count(span[0], span, busdaycal=calendar)
+        is_session = np.is_busday(span, busdaycal=calendar)
+
+        offset = days - first
+        flags["off_calendar"] = ~is_session[offset]
+
+        # Sessions strictly between the previous bar and this one
+        number = session_number[offset]
+        missing[1:] = number[1:] - number[:-1] - is_session[offset[:-1]]
+        missing[~has_prev] = 0
+
+    flags["calendar_gap"] = missing > gap_tolerance
+
+    if "Close" in values:
+        close = values["Close"]
+        flags["split_like_jump"] = _vs_previous(
+            has_prev, close[1:], close[:-1],
+            lambda cur, prev: (cur > SPLIT_JUMP * prev) | (prev > SPLIT_JUMP * cur)
+        )
+
+    report = _report(days, starts, tickers, flags, np.where(flags["calendar_gap"], missing, 0))
+
+    if quarantine:
+        bad = np.zeros(n, dtype=bool)
+        for check in QUARANTINE_CHECKS:
+            if check in flags:
+                bad |= flags[check]
+        df = df.loc[~bad].reset_index(drop=True)
+        report["quarantined"] = int(bad.sum())
+
+    return df, report
+
+
+def _report(days, starts, tickers, flags, missing) -> dict:
+    n_groups = len(tickers)
+
+    issues, by_ticker, examples = {}, {}, {}
+
+    for check, mask in flags.items():
+        count = int(mask.sum())
+        issues[check] = count
+        if not count:
+            continue
+
+        # Group of each flagged row, from the group start offsets
+        rows = np.flatnonzero(mask)
+        codes = np.searchsorted(starts, rows, side="right") - 1
+
+        per_group = np.bincount(codes, minlength=n_groups)
+        for code in np.flatnonzero(per_group):
+            ticker = tickers[code] if tickers[code] is not None else "_"
+            by_ticker.setdefault(ticker, {})[check] = int(per_group[code])
+
+        examples[check] = [
+            {
+                "ticker": tickers[code],
+                "date": str(np.datetime64(int(days[i]), "D"))
+            }
+            for i, code in zip(rows[:MAX_EXAMPLES], codes[:MAX_EXAMPLES])
+        ]
+
+    return {
+        "rows": len(days),
+        "tickers": n_groups,
+        "passed": not any(issues.values()),
+        "issues": issues,
+        "missing_sessions": int(missing.sum()),  # in reported gaps only
+        "by_ticker": by_ticker,
+        "examples": examples,
+        "quarantined": 0
+    }
+
+
+def summarize_report(report) -> str:
+    found = {check: count for check, count in report["issues"].items() if count}
+    if not found:
+        return f"✔ Data quality: {report['rows']} rows, no issues"
+
+    details = ", ".join(f"{check}={count}" for check, count in found.items())
+    line = f"⚠️ Data quality: {report['rows']} rows, {details}"
+    if report["quarantined"]:
+        line += f" ({report['quarantined']} rows quarantined)"
+    return line
+
+
+if __name__ == "__main__":
+    import time
+
+    from src.panel_features import build_panel, build_panel_features
+
+    rng = np.random.default_rng(11)
+    n_days = 1500
+    dates = pd.bdate_range("2019-01-01", periods=n_days)
+
+    def synthetic_frame():
+        close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.015, n_days)))
+        spread = close * rng.uniform(0, 0.01, n_days)
+        return pd.DataFrame({
+            "Date": dates,
+            "Open": close + rng.uniform(-1, 1, n_days) * spread,
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": rng.integers(100_000, 1_000_000, n_days).astype(float)
+        })
+
+    frames = {f"T{i:03d}": synthetic_frame() for i in range(500)}
+
+    # A few injected faults on one ticker
+    bad = frames["T007"]
+    bad.loc[10, "Volume"] = 0
+    bad.loc[20, "High"] = bad.loc[20, "Low"] - 1
+    bad.loc[30:, ["Open", "High", "Low", "Close"]] /= 2  # 2:1 split
+    frames["T007"] = pd.concat([bad.drop(index=range(40, 45)), bad.iloc[[50]]])
+
+    panel = build_panel(frames)
+
+    def best_of(fn, runs=3):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - start)
+        return result, min(timings)
+
+    (clean, report), check_time = best_of(lambda: check_quality(panel, quarantine=True))
+    _, feature_time = best_of(lambda: build_panel_features(clean))
+
+    print("===== DATA QUALITY GATE (500 tickers) =====")
+    print(summarize_report(report))
+    print("T007:", report["by_ticker"].get("T007"))
+    print(
+        f"check {check_time:.3f} s vs feature build {feature_time:.3f} s "
+        f"({check_time / feature_time:.1%})"
+    )
@@ -0,0 +1,215 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+from src.profiling import in_profiled_thread
+
+
+# -----------------------------
+# Per-request latency budgets
+# -----------------------------
+# A Deadline is created once per request and handed down the pipeline.
+# Each stage runs with min(stage budget, time left); a stage that overruns
+# raises StageTimeout so the caller can degrade instead of hanging.
+TOTAL_BUDGET_MS = float(os.getenv("ANALYZE_BUDGET_MS", "10000"))
+
+STAGE_BUDGETS_MS = {
+    "market_data": float(os.getenv("BUDGET_MARKET_DATA_MS", "5000")),
+    "model": float(os.getenv("BUDGET_MODEL_MS", "1000")),
+    "news": float(os.getenv("BUDGET_NEWS_MS", "2500")),
+    "summary": float(os.getenv("BUDGET_SUMMARY_MS", "5000")),
+}
+
+# Stage work runs here so the caller can stop waiting on it. A timed-out
+# call keeps running in the background until it returns on its own (stage
+# code passes its remaining budget down as I/O timeouts so that is soon).
+# Every submitted call holds a slot until it really finishes; with all
+# slots taken, new stage work fails fast with StageOverloaded instead of
+# queueing behind hung calls.
+STAGE_MAX_WORKERS = int(os.getenv("STAGE_MAX_WORKERS", "32"))
+
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=STAGE_MAX_WORKERS,
+    thread_name_prefix="stage"
+)
+_SLOTS = threading.BoundedSemaphore(STAGE_MAX_WORKERS)
+_IN_FLIGHT = {"count": 0}
+_IN_FLIGHT_LOCK = threading.Lock()
+
+
+def stage_work_in_flight() -> dict:
+    """
+    Stage calls still running (timed-out ones included) vs the pool size.
+    """
+    return {"in_flight": _IN_FLIGHT["count"], "max": STAGE_MAX_WORKERS}
+
+
+class StageTimeout(Exception):
+    def __init__(self, stage, budget_ms):
+        super().__init__(f"Stage '{stage}' exceeded its {budget_ms:.0f} ms budget")
+        self.stage = stage
+        self.budget_ms = budget_ms
+
+
+class StageOverloaded(Exception):
+    def __init__(self, stage):
+        super().__init__(
+            f"Stage '{stage}' rejected: all {STAGE_MAX_WORKERS} stage workers are busy"
+        )
+        self.stage = stage
+
+
+def _release_slot(_future):
+    with _IN_FLIGHT_LOCK:
+        _IN_FLIGHT["count"] -= 1
+    _SLOTS.release()
+
+
+class Deadline:
+    """
+    Total latency budget for one request, with per-stage sub-budgets.
+    Records how long each stage took and which ones were skipped.
+    """
+
+    def __init__(self, total_ms=TOTAL_BUDGET_MS, stage_budgets_ms=None):
+        self.total_ms = total_ms
+        self.stage_budgets_ms = {**STAGE_BUDGETS_MS, **(stage_budgets_ms or {})}
+        self.started = time.monotonic()
+
+        self.stage_latency_ms = {}
+        self.skipped_stages = []
+        self._lock = threading.Lock()
+
+    def remaining_ms(self) -> float:
+        return self.total_ms - (time.monotonic() - self.started) * 1000
+
+    def stage_budget_ms(self, stage) -> float:
+        return max(0.0, min(self.stage_budgets_ms.get(stage, self.total_ms), self.remaining_ms()))
+
+    def skip(self, stage, reason):
+        with self._lock:
+            self.skipped_stages.append({"stage": stage, "reason": reason})
+
+    def run(self, stage, fn, *args, **kwargs):
+        """
+        Run fn within the stage budget; raise StageTimeout on overrun, or
+        StageOverloaded at once when no stage worker is free.
+        """
+        budget_ms = self.stage_budget_ms(stage)
+        if budget_ms <= 0:
+            raise StageTimeout(stage, 0.0)
+
+        if not _SLOTS.acquire(blocking=False):
+            raise StageOverloaded(stage)
+        with _IN_FLIGHT_LOCK:
+            _IN_FLIGHT["count"] += 1
+
+        start = time.monotonic()
+        # The caller's context (e.g. an active X-Profile profiler) follows
+        # the work onto the stage thread
+        future = _EXECUTOR.submit(
+            contextvars.copy_context().run, in_profiled_thread, fn, *args, **kwargs
+        )
+        future.add_done_callback(_release_slot)
+
+        try:
+            return future.result(timeout=budget_ms / 1000)
+        except FuturesTimeout:
+            future.cancel()
+            raise StageTimeout(stage, budget_ms)
+        finally:
+            with self._lock:
+                self.stage_latency_ms[stage] = round((time.monotonic() - start) * 1000, 1)
+
+    @property
+    def degraded(self) -> bool:
+        return bool(self.skipped_stages)
+
+    def metadata(self) -> dict:
+        return {
+            "budget_ms": self.total_ms,
+            "elapsed_ms": round((time.monotonic() - self.started) * 1000, 1),
+            "stage_latency_ms": dict(self.stage_latency_ms),
+            "skipped_stages": list(self.skipped_stages)
+        }
+
+
+if __name__ == "__main__":
+    # SLO check with slow stubs: a hung news feed and a hung LLM must not
+    # push /analyze past its budget; the report degrades instead.
+    import numpy as np
+    import pandas as pd
+
+    import src.agentic_context as agentic_context
+    import src.model_inference as model_inference
+    from src.llm_dispatcher import LLMDispatcher, StubLLMBackend
+
+    def synthetic_prices(n=400):
+        rng = np.random.default_rng(0)
+        close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+        return pd.DataFrame({
+            "Date": pd.bdate_range("2024-01-01", periods=n),
+            "Open": close, "High": close, "Low": close, "Close": close,
+            "Volume": rng.integers(100_000, 1_000_000, n).astype(float)
+        })
+
+    def slow_news(**kwargs):
+        time.sleep(30)
+        return []
+
+    model_inference.fetch_nse_data = lambda ticker: synthetic_prices()
+    agentic_context.fetch_google_news = slow_news
+    agentic_context._DISPATCHER = LLMDispatcher(StubLLMBackend(latency=30))
+    model_inference.load_model("TCS")  # served processes load models at warmup
+
+    budget_ms = 3000
+    cases = {
+        "slow news": {"news": 500},
+        "slow summary": {"summary": 500},
+    }
+
+    print("===== LATENCY BUDGET SLO =====")
+    for name, stage_budgets in cases.items():
+        deadline = Deadline(total_ms=budget_ms, stage_budgets_ms=stage_budgets)
+        headlines = None if name == "slow news" else ["TCS Q3 earnings beat estimates"]
+
+        start = time.monotonic()
+        report = agentic_context.run_pipeline(
+            "TCS", news=headlines, summarizer="llm", deadline=deadline
+        )
+        elapsed_ms = (time.monotonic() - start) * 1000
+
+        assert elapsed_ms < budget_ms, elapsed_ms
+        assert report["explanation"]["summary_degraded"]
+        assert report["context"]["confidence_modifier"] == "decrease"
+
+        skipped = [s["stage"] for s in report["metadata"]["latency"]["skipped_stages"]]
+        print(f"{name:<13} {elapsed_ms:7.0f} ms (budget {budget_ms} ms), skipped: {skipped}")
+
+    # The hung LLM got the stage budget as its timeout, so its worker is
+    # back shortly after the summary stage gave up (the news stub ignores
+    # timeouts and still holds one)
+    time.sleep(0.2)
+    in_flight = stage_work_in_flight()["in_flight"]
+    assert in_flight <= 1, in_flight
+    print(f"stage workers still busy after the run: {in_flight} (hung news stub)")
+
+    # Saturated pool: new stage work is rejected at once, not queued
+    release = threading.Event()
+    for _ in range(STAGE_MAX_WORKERS - in_flight):
+        _SLOTS.acquire()
+        _EXECUTOR.submit(release.wait).add_done_callback(_release_slot)
+        with _IN_FLIGHT_LOCK:
+            _IN_FLIGHT["count"] += 1
+
+    start = time.monotonic()
+    try:
+        Deadline().run("model", lambda: None)
+        raise AssertionError("expected StageOverloaded")
+    except StageOverloaded as e:
+        print(f"saturated pool: rejected in {(time.monotonic() - start) * 1000:.2f} ms ({e})")
+    release.set()
+
+    os._exit(0)  # don't wait for the deliberately hung stub calls
@@ -0,0 +1,211 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+
+# -----------------------------
+# Streaming feature-drift monitor
+# -----------------------------
+# Reference sketches are fixed-bin histograms with quantile edges taken
+# from the training frame (saved next to each model). At inference every
+# prediction adds one observation per feature to a live histogram over
+# the same bins, so memory per (ticker, feature) is n_bins floats no
+# matter how long the service runs. Live counts decay geometrically so
+# recent traffic dominates the comparison.
+#
+# PSI / KS on a handful of observations is noise (a sample drawn from the
+# reference itself scores PSI > 1 at n=20), and the prediction cache
+# gives about one observation per ticker per bar. Until the decayed live
+# count reaches DRIFT_MIN_SAMPLES a feature reports "insufficient_data"
+# instead of a status. The decayed count is capped at 1 / (1 - decay).
+N_BINS = 10
+DRIFT_DECAY = float(os.getenv("DRIFT_DECAY", "0.995"))
+DRIFT_MIN_SAMPLES = float(os.getenv("DRIFT_MIN_SAMPLES", "100"))
+PSI_WARN = 0.1
+PSI_ALERT = 0.25
+_EPS = 1e-4
+
+
+def reference_path(ticker: str, model_dir="models") -> str:
+    return os.path.join(model_dir, f"{ticker.upper()}.drift.json")
+
+
+def build_reference(df, features, n_bins=N_BINS) -> dict:
+    """
+    {feature: {"edges": [...], "counts": [...]}} from a training frame.
+    """
+    reference = {}
+
+    for feature in features:
+        values = df[feature].to_numpy(dtype="float64")
+        values = values[np.isfinite(values)]
+
+        quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+        edges = np.unique(np.quantile(values, quantiles)) if len(values) else np.array([])
+        counts = np.bincount(
+            np.searchsorted(edges, values, side="right"),
+            minlength=len(edges) + 1
+        )
+
+        reference[feature] = {
+            "edges": edges.tolist(),
+            "counts": counts.astype(float).tolist()
+        }
+
+    return reference
+
+
+def save_reference(ticker: str, reference: dict, model_dir="models") -> str:
+    path = reference_path(ticker, model_dir)
+    with open(path, "w") as f:
+        json.dump(reference, f)
+    return path
+
+
+def load_reference(ticker: str, model_dir="models"):
+    path = reference_path(ticker, model_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def psi(expected, actual) -> float:
+    """
+    Population stability index between two histograms over the same bins.
+    """
+    p = np.asarray(expected, dtype="float64")
+    q = np.asarray(actual, dtype="float64")
+    p = np.clip(p / p.sum(), _EPS, None)
+    q = np.clip(q / q.sum(), _EPS, None)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def ks_statistic(expected, actual) -> float:
+    """
+    Kolmogorov-Smirnov distance between the two binned CDFs.
+    """
+    p = np.cumsum(expected) / np.sum(expected)
+    q = np.cumsum(actual) / np.sum(actual)
+    return float(np.max(np.abs(p - q)))
+
+
+class DriftMonitor:
+    """
+    Per-(ticker, feature) live histograms compared with training sketches.
+    """
+
+    def __init__(self, model_dir="models", decay=DRIFT_DECAY, min_samples=DRIFT_MIN_SAMPLES):
+        self.model_dir = model_dir
+        self.decay = decay
+        self.min_samples = min_samples
+
+        self._references = {}   # ticker -> reference dict | None
+        self._live = {}         # (ticker, feature) -> np.ndarray of counts
+        self._observations = {} # ticker -> predictions seen
+        self._lock = threading.Lock()
+
+    def _reference(self, ticker):
+        if ticker not in self._references:
+            self._references[ticker] = load_reference(ticker, self.model_dir)
+        return self._references[ticker]
+
+    def preload(self, tickers):
+        """
+        Load reference sketches up front (e.g. before forking workers).
+        """
+        with self._lock:
+            for ticker in tickers:
+                self._reference(ticker.upper())
+
+    def update(self, ticker: str, row: dict):
+        """
+        Add one prediction's feature values. O(n_bins) per feature.
+        """
+        ticker = ticker.upper()
+
+        with self._lock:
+            reference = self._reference(ticker)
+            if reference is None:
+                return
+
+            self._observations[ticker] = self._observations.get(ticker, 0) + 1
+
+            for feature, sketch in reference.items():
+                value = row.get(feature)
+                if value is None or not np.isfinite(value):
+                    continue
+
+                key = (ticker, feature)
+                live = self._live.get(key)
+                if live is None:
+                    live = np.zeros(len(sketch["counts"]))
+                    self._live[key] = live
+
+                live *= self.decay
+                live[np.searchsorted(sketch["edges"], value, side="right")] += 1.0
+
+    def report(self) -> dict:
+        """
+        PSI / KS per ticker and feature, plus an overall status.
+        """
+        out = {}
+
+        with self._lock:
+            for ticker, reference in self._references.items():
+                if reference is None:
+                    out[ticker] = {"status": "no_reference"}
+                    continue
+
+                features = {}
+                for feature, sketch in reference.items():
+                    live = self._live.get((ticker, feature))
+                    if live is None or live.sum() == 0:
+                        continue
+
+                    score = psi(sketch["counts"], live)
+                    effective_n = float(live.sum())
+                    features[feature] = {
+                        "psi": round(score, 4),
+                        "ks": round(ks_statistic(sketch["counts"], live), 4),
+                        "effective_n": round(effective_n, 1),
+                        "status": (
+                            "insufficient_data" if effective_n < self.min_samples
+                            else "alert" if score >= PSI_ALERT
+                            else "warn" if score >= PSI_WARN
+                            else "ok"
+                        )
+                    }
+
+                statuses = {f["status"] for f in features.values()}
+                out[ticker] = {
+                    "observations": self._observations.get(ticker, 0),
+                    "status": (
+                        "alert" if "alert" in statuses
+                        else "warn" if "warn" in statuses
+                        else "ok" if "ok" in statuses
+                        else "insufficient_data"
+                    ),
+                    "features": features
+                }
+
+        return out
+
+
+_MONITOR = None
+_MONITOR_LOCK = threading.Lock()
+
+
+def get_drift_monitor() -> DriftMonitor:
+    global _MONITOR
+
+    if _MONITOR is None:
+        with _MONITOR_LOCK:
+            if _MONITOR is None:
+                from src.model_inference import MODEL_DIR
+
+                _MONITOR = DriftMonitor(model_dir=MODEL_DIR)
+
+    return _MONITOR
@@ -1,10 +1,43 @@
+import os
+
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
-from lightgbm import LGBMClassifier
 
+REPORTS_DIR = "reports"
+
+
+def compute_contributions(model, X):
+    """
+    Per-row LightGBM feature contributions (log-odds space) via pred_contrib.
+
+    A single booster call returns both the explanation and the score:
+    the contributions plus the bias column sum to the raw margin, so the
+    probability is recovered with a sigmoid instead of a second predict.
+
+    Returns (probabilities, contributions_df, bias).
+    """
+    features = list(X.columns)
+    contrib = np.asarray(model.predict(X, pred_contrib=True))
+
+    raw_score = contrib.sum(axis=1)
+    probabilities = 1.0 / (1.0 + np.exp(-raw_score))
+
+    contributions = pd.DataFrame(
+        contrib[:, :-1], columns=features, index=X.index
+    )
+    bias = contrib[:, -1]
+
+    return probabilities, contributions, bias
+
+
+def plot_feature_importance(model, features, output_path=None):
+    # Plotting is offline-only; keep matplotlib out of the serving import path
+    import matplotlib
+
+    matplotlib.use("Agg")  # headless: render to files, never block on a window
+    import matplotlib.pyplot as plt
 
-def plot_feature_importance(model, features):
     importance = model.feature_importances_
 
     imp_df = pd.DataFrame({
@@ -21,14 +54,23 @@ def plot_feature_importance(model, features):
     plt.title("LightGBM Feature Importance")
     plt.xlabel("Importance Score")
     plt.tight_layout()
-    plt.show()
 
-    
+    if output_path is None:
+        output_path = os.path.join(REPORTS_DIR, "feature_importance.png")
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    plt.savefig(output_path, dpi=120)
+    plt.close()
+
+    print(f"Saved feature importance plot → {output_path}")
+
+    return output_path
 
 
 if __name__ == "__main__":
-    from split_and_checks import time_based_split
-    from regime_features import add_regime_features
+    from lightgbm import LGBMClassifier
+    from src.split_and_checks import time_based_split
+    from src.regime_features import add_regime_features
 
     # Load data
     df = pd.read_parquet("data/processed/reliance_labeled.parquet")
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 
+from src.rolling_stats import rolling_stat, rolling_stats
+
 
 def compute_vol_past(df, window=20):
     """
@@ -10,9 +12,7 @@ def compute_vol_past(df, window=20):
     df = df.copy()
 
     df["vol_past"] = (
-        df["log_return"]
-        .rolling(window)
-        .std()
+        rolling_stat(df["log_return"], window, "std")
         * np.sqrt(252)
     )
 
@@ -26,21 +26,24 @@ def add_volatility_regime_features(df, window=20):
     """
     df = df.copy()
 
-    # Percentile of past volatility
-    df["vol_percentile"] = (
-        df["vol_past"]
-        .rolling(window)
-        .apply(lambda x: pd.Series(x).rank(pct=True).iloc[-1])
+    stats = rolling_stats(
+        df,
+        [
+            ("vol_past", window, "rank_pct"),
+            ("vol_past", window, "max"),
+            ("Close", window, "mean"),
+        ],
+        names=["vol_rank", "vol_max", "ma"]
     )
 
+    # Percentile of past volatility
+    df["vol_percentile"] = stats["vol_rank"]
+
     # Volatility compression (current vs recent max)
-    df["vol_compression"] = (
-        df["vol_past"] /
-        df["vol_past"].rolling(window).max()
-    )
+    df["vol_compression"] = df["vol_past"] / stats["vol_max"]
 
     # Trend strength (normalized moving average slope)
-    ma = df["Close"].rolling(window).mean()
+    ma = stats["ma"]
     df["trend_strength"] = (ma - ma.shift(window)) / ma.shift(window)
 
     return df
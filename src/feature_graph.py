@@ -0,0 +1,224 @@
+import numpy as np
+import pandas as pd
+
+from src.rolling_stats import rolling_stat
+
+
+# -----------------------------
+# Feature registry
+# -----------------------------
+# Every feature declares its inputs, its window and an implementation
+# taking the input Series (plus window) and returning a Series.
+# Named feature sets resolve the two historical definitions of
+# vol_percentile / vol_compression / trend_strength:
+#
+#   "v1"        -> feature_engineering (what the saved models are served with)
+#   "regime_v1" -> regime_features (baseline / explainability experiments)
+#
+# Both sets inherit the shared "base" nodes, so intermediates like the
+# 20-day Close mean are defined, and computed, once.
+#
+# Cross-sectional features (src.market_features) need the whole universe,
+# so they are joined onto the frame beforehand and enter the graph as raw
+# columns.
+RAW_COLUMNS = {
+    "Close", "Volume",
+    "market_vol", "sector_vol", "market_beta", "avg_correlation"
+}
+
+FEATURE_SETS = {
+    "base": {},
+    "v1": {},
+    "regime_v1": {},
+}
+
+DEFAULT_FEATURE_SET = "v1"
+
+
+def register(feature_set, name, inputs, window=None):
+    """
+    Decorator: add a feature node to a named feature set.
+    """
+    if feature_set not in FEATURE_SETS:
+        raise ValueError(f"Unknown feature set '{feature_set}'")
+
+    def decorator(fn):
+        FEATURE_SETS[feature_set][name] = {
+            "inputs": tuple(inputs),
+            "window": window,
+            "fn": fn,
+        }
+        return fn
+
+    return decorator
+
+
+def _nodes(feature_set):
+    if feature_set not in FEATURE_SETS or feature_set == "base":
+        raise ValueError(
+            f"Unknown feature set '{feature_set}'. "
+            f"Available: {sorted(s for s in FEATURE_SETS if s != 'base')}"
+        )
+
+    return {**FEATURE_SETS["base"], **FEATURE_SETS[feature_set]}
+
+
+# -----------------------------
+# Shared base nodes
+# -----------------------------
+@register("base", "log_return", inputs=["Close"])
+def _log_return(close, window):
+    return np.log(close / close.shift(1))
+
+
+@register("base", "vol_20", inputs=["log_return"], window=20)
+def _vol_20(log_return, window):
+    return rolling_stat(log_return, window, "std")
+
+
+@register("base", "vol_252", inputs=["log_return"], window=252)
+def _vol_252(log_return, window):
+    return rolling_stat(log_return, window, "std")
+
+
+@register("base", "close_ma_20", inputs=["Close"], window=20)
+def _close_ma_20(close, window):
+    return rolling_stat(close, window, "mean")
+
+
+@register("base", "close_std_20", inputs=["Close"], window=20)
+def _close_std_20(close, window):
+    return rolling_stat(close, window, "std")
+
+
+# -----------------------------
+# v1: feature_engineering definitions (served models)
+# -----------------------------
+@register("v1", "vol_past", inputs=["vol_20"])
+def _v1_vol_past(vol_20, window):
+    return vol_20 * np.sqrt(252)
+
+
+@register("v1", "vol_percentile", inputs=["vol_past"], window=20)
+def _v1_vol_percentile(vol_past, window):
+    return rolling_stat(vol_past, window, "rank_pct")
+
+
+@register("v1", "vol_max_20", inputs=["vol_past"], window=20)
+def _v1_vol_max(vol_past, window):
+    return rolling_stat(vol_past, window, "max")
+
+
+@register("v1", "vol_compression", inputs=["vol_past", "vol_max_20"])
+def _v1_vol_compression(vol_past, vol_max, window):
+    return vol_past / vol_max
+
+
+@register("v1", "trend_strength", inputs=["close_ma_20"], window=20)
+def _v1_trend_strength(ma, window):
+    prev = ma.shift(window)
+    return (ma - prev) / prev
+
+
+# -----------------------------
+# regime_v1: regime_features definitions
+# -----------------------------
+@register("regime_v1", "vol_past", inputs=["vol_20"])
+def _regime_vol_past(vol_20, window):
+    # label_generation's (non-annualized) past volatility
+    return vol_20
+
+
+@register("regime_v1", "vol_percentile", inputs=["vol_20"], window=252)
+def _regime_vol_percentile(vol_20, window):
+    return rolling_stat(vol_20, window, "rank_pct")
+
+
+@register("regime_v1", "vol_compression", inputs=["vol_20", "vol_252"])
+def _regime_vol_compression(vol_20, vol_252, window):
+    return vol_20 / vol_252
+
+
+@register(
+    "regime_v1", "trend_strength",
+    inputs=["Close", "close_ma_20", "close_std_20"]
+)
+def _regime_trend_strength(close, ma, std, window):
+    return (close - ma).abs() / std
+
+
+# -----------------------------
+# Planner
+# -----------------------------
+def plan(features, feature_set=DEFAULT_FEATURE_SET):
+    """
+    Resolve the minimal set of nodes needed for `features`,
+    in dependency order. Raw columns are not part of the plan.
+    """
+    nodes = _nodes(feature_set)
+    order = []
+    state = {}  # name -> "visiting" | "done"
+
+    def visit(name, path):
+        if name in RAW_COLUMNS or state.get(name) == "done":
+            return
+
+        if state.get(name) == "visiting":
+            raise ValueError(f"Cycle in feature graph: {' -> '.join(path + [name])}")
+
+        if name not in nodes:
+            raise ValueError(
+                f"Unknown feature '{name}' in feature set '{feature_set}'"
+            )
+
+        state[name] = "visiting"
+        for dep in nodes[name]["inputs"]:
+            visit(dep, path + [name])
+        state[name] = "done"
+        order.append(name)
+
+    for feature in features:
+        visit(feature, [])
+
+    return order
+
+
+def compute_features(df, features, feature_set=DEFAULT_FEATURE_SET):
+    """
+    Evaluate only what `features` needs and return df with those
+    columns added (intermediates are not kept).
+
+    Each node is computed once into a shared cache; the input frame is
+    copied a single time, when the requested columns are attached.
+    """
+    nodes = _nodes(feature_set)
+    cache = {}
+
+    for name in plan(features, feature_set):
+        node = nodes[name]
+        args = [
+            cache[dep] if dep in cache else df[dep]
+            for dep in node["inputs"]
+        ]
+        cache[name] = node["fn"](*args, node["window"])
+
+    return df.assign(**{
+        name: cache[name] if name in cache else df[name]
+        for name in features
+    })
+
+
+if __name__ == "__main__":
+    FEATURES = [
+        "log_return",
+        "vol_past",
+        "Volume",
+        "vol_percentile",
+        "vol_compression",
+        "trend_strength"
+    ]
+
+    for feature_set in ("v1", "regime_v1"):
+        print(f"{feature_set}: {plan(FEATURES, feature_set)}")
+
+    print(f"v1 trend_strength only: {plan(['trend_strength'], 'v1')}")
@@ -1,6 +1,8 @@
 import numpy as np
 import pandas as pd
 
+from src.rolling_stats import rolling_stat
+
 PAST_WINDOW = 20     # days
 FUTURE_WINDOW = 5   # days
 VOL_MULTIPLIER = 1.5
@@ -12,7 +14,7 @@ def compute_returns(df):
 
 
 def compute_volatility(series, window):
-    return series.rolling(window=window).std()
+    return rolling_stat(series, window, "std")
 
 
 def generate_volatility_expansion_label(df):
@@ -20,29 +22,33 @@ def generate_volatility_expansion_label(df):
     Generate binary label:
     1 -> volatility expansion expected
     0 -> normal volatility
+
+    The label compares daily (non-annualized) past and future vols. An
+    existing vol_past column (the served, annualized feature) is left
+    alone; only a frame without one gets the daily past vol as vol_past.
     """
     df = df.copy()
 
     # Past volatility (only past data)
-    df['vol_past'] = compute_volatility(df['log_return'], PAST_WINDOW)
+    vol_past = compute_volatility(df['log_return'], PAST_WINDOW)
+    if 'vol_past' not in df.columns:
+        df['vol_past'] = vol_past
 
     # Future volatility (used ONLY for label)
-    df['vol_future'] = (
-        df['log_return']
-        .shift(-1)
-        .rolling(window=FUTURE_WINDOW)
-        .std()
+    df['vol_future'] = compute_volatility(
+        df['log_return'].shift(-1),
+        FUTURE_WINDOW
     )
 
     df['vol_expansion'] = (
-        df['vol_future'] > VOL_MULTIPLIER * df['vol_past']
+        df['vol_future'] > VOL_MULTIPLIER * vol_past
     ).astype(int)
 
     return df
 
 
 if __name__ == "__main__":
-    from data_ingestion import fetch_nse_data
+    from src.data_ingestion import fetch_nse_data
 
     df = fetch_nse_data("RELIANCE")
     df = compute_returns(df)
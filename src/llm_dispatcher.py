@@ -0,0 +1,415 @@
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+# -----------------------------
+# Dispatcher configuration
+# -----------------------------
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+RATE_PER_SEC = float(os.getenv("LLM_RATE_PER_SEC", "2.0"))
+BURST = int(os.getenv("LLM_BURST", "4"))
+BATCH_WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", "50"))
+MAX_BATCH_SIZE = int(os.getenv("LLM_MAX_BATCH_SIZE", "8"))
+MAX_QUEUE_SIZE = int(os.getenv("LLM_MAX_QUEUE_SIZE", "256"))
+
+
+# -----------------------------
+# Prompts
+# -----------------------------
+def single_prompt(ticker: str, date: str) -> str:
+    return f"""
+You are given news headlines published around {date}.
+
+IMPORTANT:
+- Base your reasoning strictly on the provided headlines.
+- If the headlines are insufficient to explain volatility, explicitly state that.
+- Do NOT infer context from outdated events.
+
+Summarize possible drivers of stock volatility for {ticker}.
+"""
+
+
+def batch_prompt(tickers, date: str) -> str:
+    return f"""
+You are given news headlines published around {date} for several stocks.
+Headlines are grouped under "### <TICKER>" sections.
+
+IMPORTANT:
+- Base your reasoning strictly on the headlines in each stock's own section.
+- If a section's headlines are insufficient to explain volatility, explicitly state that.
+- Do NOT infer context from outdated events.
+
+For each stock, summarize possible drivers of its stock volatility.
+Respond with ONLY a JSON object mapping each ticker to its summary string,
+with exactly these keys: {json.dumps(list(tickers))}
+"""
+
+
+def batch_content(items) -> str:
+    return "\n\n".join(
+        f"### {ticker}\n" + "\n".join(headlines)
+        for ticker, headlines in items.items()
+    )
+
+
+def parse_batch_response(text: str, tickers) -> dict:
+    """
+    Split a batched JSON response back into {ticker: summary}.
+    Tickers missing from the response are left out.
+    """
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if not match:
+        return {}
+
+    try:
+        data = json.loads(match.group(0))
+    except ValueError:
+        return {}
+
+    if not isinstance(data, dict):
+        return {}
+
+    return {
+        ticker: str(data[ticker])
+        for ticker in tickers
+        if isinstance(data.get(ticker), str) and data[ticker].strip()
+    }
+
+
+# -----------------------------
+# Token bucket
+# -----------------------------
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+
+# -----------------------------
+# Dispatcher
+# -----------------------------
+def request_key(ticker: str, date: str, headlines):
+    """
+    (ticker, date, headline digest): requests with equal keys can share
+    one summary. Headline order does not matter.
+    """
+    digest = hashlib.sha256()
+    for headline in sorted(headlines):
+        digest.update(headline.encode() + b"\0")
+    return ticker, date, digest.hexdigest()[:16]
+
+
+def _expired(item) -> bool:
+    expires = item[4]
+    return expires is not None and time.monotonic() >= expires
+
+
+def _time_left(items):
+    """
+    Seconds until the last caller in items gives up (None: no limit).
+    """
+    if any(item[4] is None for item in items):
+        return None
+    return max(item[4] for item in items) - time.monotonic()
+
+
+class LLMDispatcher:
+    """
+    Bounded, rate-limited LLM work queue with micro-batching.
+
+    backend(system_prompt, user_content, timeout=None) -> str is the only
+    thing that talks to the model; timeout is the longest time any caller
+    in the call is still waiting. Work whose callers have all given up is
+    dropped before it reaches the backend. Summary requests arriving within
+    the batching window (same news date) are merged into one structured
+    prompt and the response is split back per ticker; anything the batch
+    response misses is retried on its own. Requests are only deduplicated
+    when ticker, date and headlines all match (request_key).
+    """
+
+    def __init__(
+        self,
+        backend,
+        max_concurrency=MAX_CONCURRENCY,
+        rate_per_sec=RATE_PER_SEC,
+        burst=BURST,
+        batch_window_ms=BATCH_WINDOW_MS,
+        max_batch_size=MAX_BATCH_SIZE,
+        max_queue_size=MAX_QUEUE_SIZE
+    ):
+        self.backend = backend
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._bucket = TokenBucket(rate_per_sec, burst)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="llm"
+        )
+
+        self.stats = {"requests": 0, "backend_calls": 0, "batched": 0}
+        self._stats_lock = threading.Lock()
+
+        self._collector = threading.Thread(
+            target=self._collect, name="llm-batcher", daemon=True
+        )
+        self._collector.start()
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def submit(self, ticker: str, date: str, headlines, timeout=None) -> Future:
+        future = Future()
+        expires = None if timeout is None else time.monotonic() + timeout
+
+        try:
+            self._queue.put_nowait((ticker, date, list(headlines), future, expires))
+        except queue.Full:
+            raise RuntimeError("LLM work queue is full, try again later")
+
+        self._count("requests")
+        return future
+
+    def summarize(self, ticker: str, date: str, headlines, timeout=None) -> str:
+        return self.submit(ticker, date, headlines, timeout).result(timeout=timeout)
+
+    def _count(self, name):
+        # Incremented from callers, the collector and the executor threads
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def close(self):
+        self._queue.put(None)
+        self._collector.join()
+        self._executor.shutdown(wait=True)
+
+    # -----------------------------
+    # Batching
+    # -----------------------------
+    def _collect(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            deadline = time.monotonic() + self.batch_window
+            stopping = False
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            by_date = {}
+            for item in batch:
+                by_date.setdefault(item[1], []).append(item)
+
+            for date, items in by_date.items():
+                # Blocks when max_concurrency batches are in flight, which
+                # backs up the bounded queue instead of piling up threads
+                self._slots.acquire()
+                self._executor.submit(self._run_batch, date, items)
+
+            if stopping:
+                return
+
+    def _call(self, system, user, items):
+        self._bucket.acquire()
+
+        timeout = _time_left(items)
+        if timeout is not None and timeout <= 0:
+            raise TimeoutError("every caller gave up before the LLM call")
+
+        self._count("backend_calls")
+        return self.backend(system, user, timeout=timeout)
+
+    def _run_batch(self, date, items):
+        try:
+            # Callers that already gave up are not worth an LLM call
+            live = []
+            for item in items:
+                if _expired(item):
+                    item[3].set_exception(TimeoutError("LLM request expired in the queue"))
+                else:
+                    live.append(item)
+            items = live
+            if not items:
+                return
+
+            # Identical requests (same ticker, date and headlines) in one
+            # window share a single summary; the same ticker with other
+            # headlines is a different request and gets its own
+            keys = [request_key(ticker, date, headlines) for ticker, _, headlines, *_ in items]
+            groups = {}
+            for key, item in zip(keys, items):
+                groups.setdefault(key, item)
+
+            # The batched prompt is keyed by ticker, so it takes one request
+            # per ticker; the rest go through the single-request path below
+            batch = {}
+            for key in groups:
+                batch.setdefault(key[0], key)
+
+            summaries = {}
+            if len(batch) > 1:
+                self._count("batched")
+                response = self._call(
+                    batch_prompt(batch.keys(), date),
+                    batch_content({ticker: groups[key][2] for ticker, key in batch.items()}),
+                    items
+                )
+                parsed = parse_batch_response(response, batch.keys())
+                summaries = {batch[ticker]: summary for ticker, summary in parsed.items()}
+
+            for key, (ticker, _, headlines, *_) in groups.items():
+                if key not in summaries:
+                    summaries[key] = self._call(
+                        single_prompt(ticker, date),
+                        "\n".join(headlines),
+                        [item for item_key, item in zip(keys, items) if item_key == key]
+                    )
+
+            for key, item in zip(keys, items):
+                item[3].set_result(summaries[key])
+
+        except Exception as e:
+            for item in items:
+                if not item[3].done():
+                    item[3].set_exception(e)
+
+        finally:
+            self._slots.release()
+
+
+# -----------------------------
+# Stub backend (tests / benchmarks)
+# -----------------------------
+class StubLLMBackend:
+    """
+    Offline stand-in for Gemini: sleeps `latency` seconds per call and
+    echoes a deterministic summary per ticker, in the batched JSON format
+    when the prompt asks for it.
+    """
+
+    def __init__(self, latency=0.2):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, system, user, timeout=None):
+        with self._lock:
+            self.calls += 1
+
+        if timeout is not None and timeout < self.latency:
+            time.sleep(max(timeout, 0.0))
+            raise TimeoutError(f"stub LLM call exceeded {timeout:.2f} s")
+
+        time.sleep(self.latency)
+
+        sections = re.findall(r"^### (\S+)\n(.*?)(?=^### |\Z)", user, re.M | re.S)
+        if "JSON object" in system and sections:
+            return json.dumps({
+                ticker: f"{ticker}: {len(body.strip().splitlines())} headlines"
+                for ticker, body in sections
+            })
+
+        ticker = re.search(r"volatility for (\S+)\.", system).group(1)
+        return f"{ticker}: {len(user.splitlines())} headlines"
+
+
+if __name__ == "__main__":
+    n_tickers = 40
+    requests = {
+        f"T{i:02d}": [f"T{i:02d} headline {j}" for j in range(i % 5 + 1)]
+        for i in range(n_tickers)
+    }
+
+    print("===== LLM DISPATCHER (stub backend, 200 ms/call) =====")
+
+    for window_ms, batch_size in ((0, 1), (50, 8)):
+        backend = StubLLMBackend(latency=0.2)
+        dispatcher = LLMDispatcher(
+            backend,
+            max_concurrency=4,
+            rate_per_sec=20,
+            burst=4,
+            batch_window_ms=window_ms,
+            max_batch_size=batch_size
+        )
+
+        start = time.perf_counter()
+        futures = {
+            ticker: dispatcher.submit(ticker, "2026-01-05", headlines)
+            for ticker, headlines in requests.items()
+        }
+        results = {ticker: f.result() for ticker, f in futures.items()}
+        elapsed = time.perf_counter() - start
+        dispatcher.close()
+
+        # Ordering: every caller gets its own ticker's summary back
+        for ticker, summary in results.items():
+            expected = f"{ticker}: {len(requests[ticker])} headlines"
+            assert summary == expected, (summary, expected)
+
+        print(
+            f"window={window_ms:>3} ms batch<={batch_size}: "
+            f"{elapsed:.2f} s, {backend.calls} backend calls, "
+            f"{n_tickers / elapsed:.1f} summaries/s"
+        )
+
+    # Same ticker in one window: only identical headline sets are merged
+    backend = StubLLMBackend(latency=0.05)
+    dispatcher = LLMDispatcher(backend, rate_per_sec=100, batch_window_ms=50)
+    futures = [
+        dispatcher.submit("T00", "2026-01-05", ["a", "b"]),
+        dispatcher.submit("T00", "2026-01-05", ["b", "a"]),
+        dispatcher.submit("T00", "2026-01-05", ["a", "b", "c"]),
+        dispatcher.submit("T01", "2026-01-05", ["x"]),
+    ]
+    results = [f.result() for f in futures]
+    dispatcher.close()
+
+    assert results == ["T00: 2 headlines", "T00: 2 headlines", "T00: 3 headlines", "T01: 1 headlines"], results
+    assert dispatcher.stats["requests"] == 4
+    print(f"same-ticker window: {results}, {backend.calls} backend calls")
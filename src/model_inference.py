@@ -1,10 +1,21 @@
+import hashlib
+import io
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import joblib
 import pandas as pd
 
 from src.data_ingestion import fetch_nse_data
-from src.label_generation import compute_returns
-from src.feature_engineering import add_volatility_regime_features, compute_vol_past
+from src.feature_graph import compute_features
+from src.tree_model import FEATURE_SET
+from src.explainability import compute_contributions
+from src.calibration import apply_calibration, calibration_path, load_calibration
+from src.drift_monitor import get_drift_monitor
+from src.market_features import CONTAGION_FEATURES, add_contagion_features, universe_features
 
 # -----------------------------
 # Model + Feature Configuration
@@ -17,7 +28,11 @@ FEATURES = [
     "Volume",
     "vol_percentile",
     "vol_compression",
-    "trend_strength"
+    "trend_strength",
+    "market_vol",
+    "sector_vol",
+    "market_beta",
+    "avg_correlation"
 ]
 
 SUPPORTED_TICKERS = {
@@ -28,6 +43,35 @@ SUPPORTED_TICKERS = {
     "ICICIBANK"
 }
 
+# (ticker, bar date, model mtime, model version, calibration mtime) ->
+# prediction dict, contributions included. LRU, at most
+# PREDICTION_CACHE_SIZE entries: every new bar or retrained model adds a
+# key and the old ones are never looked up again.
+PREDICTION_CACHE_SIZE = 256
+_PREDICTION_CACHE = OrderedDict()
+_PREDICTION_CACHE_LOCK = threading.Lock()
+
+# ticker -> most recent prediction (stale fallback when market data is slow)
+_LATEST_PREDICTION = {}
+
+# ticker -> (file mtime, model, version); reloaded only when the .pkl changes
+_MODEL_CACHE = {}
+
+# ticker -> (file mtime or None, lookup table); see src.calibration
+_CALIBRATION_CACHE = {}
+
+# Contagion features for the whole supported universe. Built at warmup
+# and refreshed on a background thread when a ticker has a newer bar
+# than the cache or after UNIVERSE_TTL_SECONDS (intraday the last bar
+# keeps moving). Requests never wait for it: they use the last universe
+# built, or NaN contagion features before the first one.
+UNIVERSE_TTL_SECONDS = 900
+UNIVERSE_RETRY_SECONDS = 60    # after a failed refresh
+_UNIVERSE = {
+    "built_at": None, "attempted_at": None, "as_of": None,
+    "features": None, "refreshing": False, "error": None
+}
+_UNIVERSE_LOCK = threading.Lock()
 
 
 # -----------------------------
@@ -42,68 +86,319 @@ def load_model(ticker: str):
             f"Expected at: {model_path}"
         )
 
-    return joblib.load(model_path)
+    mtime = os.path.getmtime(model_path)
+    cached = _MODEL_CACHE.get(ticker)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(model_path, "rb") as f:
+        payload = f.read()
+
+    model = joblib.load(io.BytesIO(payload))
+    version = hashlib.sha256(payload).hexdigest()[:12]
+    _MODEL_CACHE[ticker] = (mtime, model, version)
+
+    return model
+
+
+def model_version(ticker: str) -> str:
+    """
+    Content hash of the ticker's model file (first 12 hex chars).
+    """
+    ticker = ticker.upper()
+    load_model(ticker)
+    return _MODEL_CACHE[ticker][2]
+
+
+def load_calibration_table(ticker: str) -> dict:
+    """
+    The ticker's calibration lookup table, reloaded when its file changes.
+    Models without one are served uncalibrated (legacy thresholds).
+    """
+    path = calibration_path(ticker, MODEL_DIR)
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+
+    cached = _CALIBRATION_CACHE.get(ticker)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    table = load_calibration(ticker, MODEL_DIR)
+    _CALIBRATION_CACHE[ticker] = (mtime, table)
+
+    return table
+
+
+def preload_models():
+    """
+    Load every supported ticker's model and calibration table into the
+    registry. Returns the tickers that were loaded.
+    """
+    loaded = []
+
+    for ticker in sorted(SUPPORTED_TICKERS):
+        try:
+            load_model(ticker)
+        except FileNotFoundError:
+            continue
+        load_calibration_table(ticker)
+        loaded.append(ticker)
+
+    return loaded
+
+
+def trained_tickers() -> list:
+    """
+    Supported tickers with a model file: the universe the risk table covers.
+    """
+    return sorted(
+        ticker for ticker in SUPPORTED_TICKERS
+        if os.path.exists(os.path.join(MODEL_DIR, f"{ticker}.pkl"))
+    )
+
+
+def loaded_models() -> dict:
+    """
+    {ticker: model version} for every model held by this process.
+    """
+    return {ticker: cached[2] for ticker, cached in sorted(_MODEL_CACHE.items())}
+
+
+def model_features(model) -> list:
+    """
+    Features the model was trained on. Models trained before the
+    contagion features keep being scored on their own columns.
+    """
+    names = getattr(model, "feature_name_", None)
+    return list(names) if names is not None else FEATURES
 
 
 # -----------------------------
-# Main Inference Function
+# Helper: Market-wide context
 # -----------------------------
-def predict_volatility(ticker: str):
+def refresh_market_context() -> bool:
     """
-    Runs end-to-end inference for a given NSE ticker.
-    Returns a structured dictionary.
+    Fetch the universe concurrently and swap in fresh contagion features.
+    Network I/O happens outside the lock; a failed refresh keeps the
+    previous universe. Returns whether the refresh succeeded.
     """
+    with _UNIVERSE_LOCK:
+        _UNIVERSE.update(attempted_at=time.monotonic(), refreshing=True)
 
-    ticker = ticker.upper()
+    try:
+        tickers = sorted(SUPPORTED_TICKERS)
+        with ThreadPoolExecutor(max_workers=len(tickers)) as pool:
+            frames = dict(zip(tickers, pool.map(fetch_nse_data, tickers)))
+        features = universe_features(frames)
+        as_of = max(df["Date"].max() for df in frames.values())
 
-    if ticker not in SUPPORTED_TICKERS:
-        raise ValueError(
-            f"Ticker '{ticker}' not supported. "
-            f"Supported tickers: {sorted(SUPPORTED_TICKERS)}"
+    except Exception as e:
+        with _UNIVERSE_LOCK:
+            _UNIVERSE.update(refreshing=False, error=f"{type(e).__name__}: {e}")
+        print(f"⚠️ Market context refresh failed: {type(e).__name__}: {e}")
+        return False
+
+    with _UNIVERSE_LOCK:
+        _UNIVERSE.update(
+            built_at=time.monotonic(), as_of=as_of,
+            features=features, refreshing=False, error=None
         )
+    return True
 
-    # 1. Load model
-    model = load_model(ticker)
 
-    # 2. Fetch latest market data
+def market_context(as_of=None):
+    """
+    Contagion features for SUPPORTED_TICKERS (see src.market_features),
+    or None if no universe has been built yet. Never blocks on the
+    network: when the cache is stale (older than UNIVERSE_TTL_SECONDS or
+    not reaching as_of, the caller's latest bar date) a background
+    refresh is started and the current universe is returned meanwhile.
+    """
+    now = time.monotonic()
+
+    with _UNIVERSE_LOCK:
+        features = _UNIVERSE["features"]
+        stale = (
+            features is None
+            or now - _UNIVERSE["built_at"] > UNIVERSE_TTL_SECONDS
+            or (as_of is not None and as_of > _UNIVERSE["as_of"])
+        )
+        retry_wait = (
+            _UNIVERSE["error"] is not None
+            and now - _UNIVERSE["attempted_at"] < UNIVERSE_RETRY_SECONDS
+        )
+
+        start = stale and not _UNIVERSE["refreshing"] and not retry_wait
+        if start:
+            _UNIVERSE["refreshing"] = True
+
+    if start:
+        threading.Thread(
+            target=refresh_market_context, name="market-context", daemon=True
+        ).start()
+
+    return features
+
+
+# -----------------------------
+# Helper: Calibrate + bucketize risk
+# -----------------------------
+def calibrate_scores(ticker: str, raw_scores):
+    """
+    (calibrated risk scores, risk buckets) for an array of raw model
+    probabilities: one vectorized lookup for the whole batch.
+    """
+    return apply_calibration(load_calibration_table(ticker.upper()), raw_scores)
+
+
+# -----------------------------
+# Stage 1: Latest feature row (market data)
+# -----------------------------
+def fetch_latest_features(ticker: str):
+    # 1. Fetch latest market data
     df = fetch_nse_data(ticker)
 
     if df.empty or len(df) < 30:
         raise ValueError(f"Not enough data to run inference for {ticker}")
 
-    # 3. Feature engineering (NO labels here)
-    df = compute_returns(df)
-    df = compute_vol_past(df)
-    df = add_volatility_regime_features(df)
+    # 2. Feature engineering (NO labels here)
+    # Cross-sectional columns first, then only the served features, with
+    # the same feature set as training
+    df = add_contagion_features(df, ticker.upper(), market_context(df["Date"].max()))
+    df = compute_features(df, FEATURES, feature_set=FEATURE_SET)
 
-    df = df.dropna().reset_index(drop=True)
+    # Contagion columns may be NaN (universe not built yet, or behind the
+    # ticker's newest bar); score_latest decides what to serve then
+    own_features = [f for f in FEATURES if f not in CONTAGION_FEATURES]
+    df = df.dropna(subset=own_features).reset_index(drop=True)
 
-    # 4. Select latest row only
+    # 3. Select latest row only
     latest_row = df.iloc[-1:]
 
-    # 5. Feature validation (CRITICAL)
+    # 4. Feature validation (CRITICAL)
     missing_features = [f for f in FEATURES if f not in latest_row.columns]
     if missing_features:
         raise ValueError(
             f"Missing required features for inference: {missing_features}"
         )
 
-    X = latest_row[FEATURES]
+    return latest_row
+
+
+# -----------------------------
+# Helper: Ticker validation
+# -----------------------------
+def check_supported(tickers):
+    unsupported = [t for t in tickers if t.upper() not in SUPPORTED_TICKERS]
+    if unsupported:
+        raise ValueError(
+            f"Ticker '{unsupported[0]}' not supported. "
+            f"Supported tickers: {sorted(SUPPORTED_TICKERS)}"
+        )
+
 
-    # 6. Predict probability
-    risk_score = float(model.predict_proba(X)[0, 1])
+# -----------------------------
+# Main Inference Function
+# -----------------------------
+def predict_volatility(ticker: str):
+    """
+    Runs end-to-end inference for a given NSE ticker.
+    Returns a structured dictionary.
+    """
+    return predict_volatility_batch([ticker])[ticker.upper()]
 
-    # 7. Bucketize risk (simple, interpretable)
-    if risk_score >= 0.65:
-        risk_bucket = "high"
-    elif risk_score >= 0.35:
-        risk_bucket = "medium"
-    else:
-        risk_bucket = "low"
 
-    return {
+def predict_volatility_batch(tickers):
+    """
+    Runs inference for several NSE tickers.
+
+    Each ticker is scored with a single pred_contrib call, which yields
+    the risk score and the per-feature contributions together.
+    Results are cached per (ticker, bar date, model file, calibration) in a bounded LRU.
+    Returns {ticker: prediction dict}.
+    """
+    tickers = [t.upper() for t in tickers]
+    check_supported(tickers)
+
+    results = {}
+
+    for ticker in tickers:
+        latest_row = fetch_latest_features(ticker)
+        results[ticker] = score_latest(ticker, latest_row)
+
+    return results
+
+
+# -----------------------------
+# Stage 2: Score the latest row (model)
+# -----------------------------
+def score_latest(ticker: str, latest_row):
+    """
+    Score one ticker's latest feature row, with contributions.
+    Cached per (ticker, bar date, model file, calibration) in a bounded LRU.
+
+    Training drops rows with NaN contagion features, so a NaN there is
+    scored as if the market were flat. While the universe does not cover
+    the bar yet (cold start, first request of a new bar) the ticker's last
+    prediction is served marked stale; with none, the row is scored but
+    marked degraded. Neither is cached.
+    """
+    ticker = ticker.upper()
+    bar_date = str(latest_row["Date"].values[0])
+
+    calibration = load_calibration_table(ticker)
+    model = load_model(ticker)
+    model_mtime, _, version = _MODEL_CACHE[ticker]
+    cache_key = (ticker, bar_date, model_mtime, version, _CALIBRATION_CACHE[ticker][0])
+    with _PREDICTION_CACHE_LOCK:
+        if cache_key in _PREDICTION_CACHE:
+            _PREDICTION_CACHE.move_to_end(cache_key)
+            return _PREDICTION_CACHE[cache_key]
+
+    X = latest_row[model_features(model)]
+    pending = [f for f in CONTAGION_FEATURES if f in X.columns and X[f].isna().any()]
+
+    if pending:
+        previous = _LATEST_PREDICTION.get(ticker)
+        if previous is not None:
+            return {**previous, "stale": True}
+
+    probabilities, contributions, bias = compute_contributions(model, X)
+    risk_scores, risk_buckets = apply_calibration(calibration, probabilities)
+    risk_score = float(risk_scores[0])
+
+    result = {
         "ticker": ticker,
-        "date": str(latest_row["Date"].values[0]),
+        "date": bar_date,
         "risk_score": round(risk_score, 6),
-        "risk_bucket": risk_bucket
+        "risk_bucket": str(risk_buckets[0]),
+        "raw_score": round(float(probabilities[0]), 6),
+        "calibration": calibration["method"],
+        "calibration_stale": bool(calibration.get("stale", False)),
+        "model_version": model_version(ticker),
+        "contributions": {
+            feature: round(float(value), 6)
+            for feature, value in contributions.iloc[0].items()
+        },
+        "base_value": round(float(bias[0]), 6)
     }
+
+    if pending:
+        return {**result, "degraded": True, "missing_features": pending}
+
+    # Streaming drift sketch: one O(1) update per scored bar
+    get_drift_monitor().update(ticker, X.iloc[0].to_dict())
+
+    with _PREDICTION_CACHE_LOCK:
+        _PREDICTION_CACHE[cache_key] = result
+        while len(_PREDICTION_CACHE) > PREDICTION_CACHE_SIZE:
+            _PREDICTION_CACHE.popitem(last=False)
+    _LATEST_PREDICTION[ticker] = result
+
+    return result
+
+
+def last_prediction(ticker: str):
+    """
+    Most recent prediction made in this process, or None.
+    """
+    return _LATEST_PREDICTION.get(ticker.upper())
@@ -0,0 +1,176 @@
+import hashlib
+import re
+
+import numpy as np
+
+
+# -----------------------------
+# Ticker aliases for relevance scoring
+# -----------------------------
+COMPANY_ALIASES = {
+    "RELIANCE": ["reliance industries", "reliance", "ril"],
+    "TCS": ["tata consultancy services", "tata consultancy", "tcs"],
+    "INFY": ["infosys", "infy"],
+    "HDFCBANK": ["hdfc bank", "hdfcbank", "hdfc"],
+    "ICICIBANK": ["icici bank", "icicibank", "icici"],
+}
+
+# Words that say nothing about which company a headline is about
+GENERIC_TOKENS = {"ltd", "limited", "bank", "industries", "services", "india", "the"}
+
+NUM_PERMUTATIONS = 64
+DUPLICATE_THRESHOLD = 0.6   # estimated Jaccard similarity
+RELEVANCE_THRESHOLD = 0.5
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(1331)
+_PERM_A = _rng.integers(1, _MERSENNE_PRIME, NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _MERSENNE_PRIME, NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def normalize_headline(headline: str) -> str:
+    """
+    Lowercase, drop the Google News " - Publisher" suffix and punctuation.
+    """
+    headline = re.sub(r"\s+-\s+[^-]+$", "", headline.strip())
+    headline = re.sub(r"[^a-z0-9&\s]", " ", headline.lower())
+    return re.sub(r"\s+", " ", headline).strip()
+
+
+def _shingles(text: str):
+    tokens = text.split()
+    return set(tokens) | {" ".join(pair) for pair in zip(tokens, tokens[1:])}
+
+
+def _hash_token(token: str) -> int:
+    digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % _MERSENNE_PRIME
+
+
+def minhash_signatures(texts) -> np.ndarray:
+    """
+    (len(texts), NUM_PERMUTATIONS) MinHash signature matrix.
+    """
+    signatures = np.full(
+        (len(texts), NUM_PERMUTATIONS), np.iinfo(np.uint64).max, dtype=np.uint64
+    )
+
+    for i, text in enumerate(texts):
+        shingles = _shingles(text)
+        if not shingles:
+            continue
+
+        hashes = np.array([_hash_token(s) for s in shingles], dtype=np.uint64)
+        # (a * x + b) mod p, all permutations at once; uint64 wraps, which is
+        # fine for MinHash as long as every row uses the same mapping
+        permuted = (hashes[:, None] * _PERM_A + _PERM_B) % np.uint64(_MERSENNE_PRIME)
+        signatures[i] = permuted.min(axis=0)
+
+    return signatures
+
+
+def near_duplicate_clusters(texts, threshold=DUPLICATE_THRESHOLD):
+    """
+    Cluster id per text; texts whose estimated Jaccard similarity reaches
+    `threshold` share the id of the earliest member of their cluster.
+    """
+    n = len(texts)
+    if n == 0:
+        return []
+
+    signatures = minhash_signatures(texts)
+    similarity = (signatures[:, None, :] == signatures[None, :, :]).mean(axis=2)
+
+    clusters = list(range(n))
+    for i in range(n):
+        if clusters[i] != i:
+            continue
+        for j in np.flatnonzero(similarity[i, i + 1:] >= threshold) + i + 1:
+            if clusters[j] == j:
+                clusters[j] = i
+
+    return clusters
+
+
+def relevance_score(text: str, ticker: str) -> float:
+    """
+    1.0 when a company alias appears as a phrase, otherwise the share of
+    distinctive company-name tokens present in the headline.
+    """
+    ticker = ticker.upper().replace(".NS", "")
+    aliases = COMPANY_ALIASES.get(ticker, [ticker.lower()])
+    padded = f" {text} "
+
+    if any(f" {alias} " in padded for alias in aliases):
+        return 1.0
+
+    name_tokens = {
+        token for alias in aliases for token in alias.split()
+    } - GENERIC_TOKENS
+    if not name_tokens:
+        return 0.0
+
+    return len(name_tokens & set(text.split())) / len(name_tokens)
+
+
+def filter_headlines(
+    headlines,
+    ticker: str,
+    max_items=None,
+    duplicate_threshold=DUPLICATE_THRESHOLD,
+    relevance_threshold=RELEVANCE_THRESHOLD
+):
+    """
+    Drop near-duplicate and off-topic headlines before summarization.
+    Keeps feed order (first copy of each story wins).
+
+    Returns (kept_headlines, report) where report counts what was dropped.
+    """
+    normalized = [normalize_headline(h) for h in headlines]
+    clusters = near_duplicate_clusters(normalized, duplicate_threshold)
+
+    kept = []
+    duplicates = irrelevant = 0
+
+    for i, headline in enumerate(headlines):
+        if clusters[i] != i:
+            duplicates += 1
+            continue
+
+        if relevance_score(normalized[i], ticker) < relevance_threshold:
+            irrelevant += 1
+            continue
+
+        kept.append(headline)
+
+    truncated = 0
+    if max_items is not None and len(kept) > max_items:
+        truncated = len(kept) - max_items
+        kept = kept[:max_items]
+
+    report = {
+        "raw": len(headlines),
+        "kept": len(kept),
+        "duplicates_dropped": duplicates,
+        "irrelevant_dropped": irrelevant,
+        "over_limit_dropped": truncated
+    }
+
+    return kept, report
+
+
+if __name__ == "__main__":
+    sample = [
+        "Reliance Industries shares fall 3% after Q3 results - Economic Times",
+        "Reliance Industries shares fall 3% after Q3 results - Moneycontrol",
+        "Reliance Industries shares fall 3 pc after Q3 results - Business Standard",
+        "RIL Q3 profit misses estimates as O2C margins shrink - Reuters",
+        "Sensex ends flat; IT stocks drag - Mint",
+        "Reliance Jio adds 4 million subscribers in December - NDTV Profit",
+    ]
+
+    kept, report = filter_headlines(sample, "RELIANCE")
+    print("===== NEWS FILTER =====")
+    for headline in kept:
+        print(" -", headline)
+    print(report)
@@ -0,0 +1,289 @@
+import numpy as np
+import pandas as pd
+
+from src.label_generation import PAST_WINDOW, FUTURE_WINDOW, VOL_MULTIPLIER
+from src.market_features import SECTORS, contagion_features, log_returns
+from src.rolling_stats import group_positions, rolling_stat, rolling_stats
+
+
+# -----------------------------
+# Panel layout
+# -----------------------------
+# Long format: one row per (Ticker, Date), sorted by Ticker then Date.
+# All rolling windows and shifts are masked at ticker boundaries, so a
+# 500-ticker panel is processed in one vectorized call per feature and
+# produces exactly what the per-ticker functions would.
+TICKER_COL = "Ticker"
+
+
+def build_panel(frames):
+    """
+    Stack per-ticker OHLCV frames ({ticker: df}) into a long-format panel.
+    """
+    panel = pd.concat(
+        [df.assign(**{TICKER_COL: ticker}) for ticker, df in frames.items()],
+        ignore_index=True
+    )
+    return sort_panel(panel)
+
+
+def panel_from_wide(columns):
+    """
+    Build a long-format panel from wide (date x ticker) frames,
+    e.g. {"Close": close_wide, "Volume": volume_wide}.
+    Rows where every column is NaN (ticker not trading yet) are dropped.
+    """
+    stacked = {
+        name: wide.stack(future_stack=True)
+        for name, wide in columns.items()
+    }
+    panel = pd.DataFrame(stacked).dropna(how="all")
+    panel.index.names = ["Date", TICKER_COL]
+    return sort_panel(panel.reset_index())
+
+
+def panel_to_wide(panel, column):
+    """
+    Pivot one panel column to a wide (date x ticker) frame.
+    """
+    return panel.pivot(index="Date", columns=TICKER_COL, values=column)
+
+
+def sort_panel(panel):
+    return panel.sort_values([TICKER_COL, "Date"]).reset_index(drop=True)
+
+
+def _group_shift(series, positions, periods):
+    """
+    Shift within each ticker: rows that would read across a ticker
+    boundary become NaN.
+    """
+    shifted = series.shift(periods)
+
+    if periods > 0:
+        shifted[positions < periods] = np.nan
+    else:
+        ends = _positions_from_end(positions)
+        shifted[ends < -periods] = np.nan
+
+    return shifted
+
+
+def _positions_from_end(positions):
+    """
+    Rows remaining after each row within its group (0 for the last row).
+    """
+    n = len(positions)
+    starts = np.flatnonzero(positions == 0)
+    lengths = np.diff(np.r_[starts, n])
+    return np.repeat(lengths, lengths) - 1 - positions
+
+
+# -----------------------------
+# Panel versions of the per-ticker functions
+# -----------------------------
+def panel_compute_returns(panel):
+    """
+    Panel version of label_generation.compute_returns.
+    """
+    panel = panel.copy()
+    _, positions = group_positions(panel[TICKER_COL].to_numpy())
+
+    prev_close = _group_shift(panel["Close"], positions, 1)
+    panel["log_return"] = np.log(panel["Close"] / prev_close)
+
+    return panel
+
+
+def panel_compute_vol_past(panel, window=20):
+    """
+    Panel version of feature_engineering.compute_vol_past.
+    """
+    panel = panel.copy()
+
+    panel["vol_past"] = (
+        rolling_stat(
+            panel["log_return"], window, "std",
+            groups=panel[TICKER_COL].to_numpy()
+        )
+        * np.sqrt(252)
+    )
+
+    return panel
+
+
+def panel_add_volatility_regime_features(panel, window=20):
+    """
+    Panel version of feature_engineering.add_volatility_regime_features.
+    Assumes vol_past already exists.
+    """
+    panel = panel.copy()
+    groups = panel[TICKER_COL].to_numpy()
+    _, positions = group_positions(groups)
+
+    stats = rolling_stats(
+        panel,
+        [
+            ("vol_past", window, "rank_pct"),
+            ("vol_past", window, "max"),
+            ("Close", window, "mean"),
+        ],
+        names=["vol_rank", "vol_max", "ma"],
+        groups=groups
+    )
+
+    panel["vol_percentile"] = stats["vol_rank"]
+    panel["vol_compression"] = panel["vol_past"] / stats["vol_max"]
+
+    ma = stats["ma"]
+    ma_prev = _group_shift(ma, positions, window)
+    panel["trend_strength"] = (ma - ma_prev) / ma_prev
+
+    return panel
+
+
+def panel_add_regime_features(panel):
+    """
+    Panel version of regime_features.add_regime_features.
+    """
+    panel = panel.copy()
+    groups = panel[TICKER_COL].to_numpy()
+
+    stats = rolling_stats(
+        panel,
+        [
+            ("log_return", 20, "std"),
+            ("log_return", 252, "std"),
+            ("Close", 20, "mean"),
+            ("Close", 20, "std"),
+        ],
+        names=["vol_20", "vol_252", "close_mean", "close_std"],
+        groups=groups
+    )
+
+    panel["vol_20"] = stats["vol_20"]
+    panel["vol_252"] = stats["vol_252"]
+    panel["vol_percentile"] = rolling_stat(
+        panel["vol_20"], 252, "rank_pct", groups=groups
+    )
+    panel["vol_compression"] = panel["vol_20"] / panel["vol_252"]
+    panel["trend_strength"] = (
+        (panel["Close"] - stats["close_mean"]).abs() / stats["close_std"]
+    )
+
+    return panel
+
+
+def panel_generate_volatility_expansion_label(panel):
+    """
+    Panel version of label_generation.generate_volatility_expansion_label
+    (an existing vol_past column is left alone).
+    """
+    panel = panel.copy()
+    groups = panel[TICKER_COL].to_numpy()
+    _, positions = group_positions(groups)
+
+    vol_past = rolling_stat(
+        panel["log_return"], PAST_WINDOW, "std", groups=groups
+    )
+    if "vol_past" not in panel.columns:
+        panel["vol_past"] = vol_past
+
+    next_return = _group_shift(panel["log_return"], positions, -1)
+    panel["vol_future"] = rolling_stat(
+        next_return, FUTURE_WINDOW, "std", groups=groups
+    )
+
+    panel["vol_expansion"] = (
+        panel["vol_future"] > VOL_MULTIPLIER * vol_past
+    ).astype(int)
+
+    return panel
+
+
+def panel_add_contagion_features(panel, sectors=SECTORS):
+    """
+    Cross-sectional features (src.market_features) with the panel's own
+    tickers as the universe.
+    """
+    features = contagion_features(
+        log_returns(panel_to_wide(panel, "Close")), sectors=sectors
+    )
+
+    stacked = pd.DataFrame({
+        name: wide.stack(future_stack=True) for name, wide in features.items()
+    })
+    stacked.index.names = ["Date", TICKER_COL]
+
+    return panel.drop(columns=list(features), errors="ignore").merge(
+        stacked.reset_index(), on=["Date", TICKER_COL], how="left"
+    )
+
+
+def build_panel_features(panel, with_labels=False):
+    """
+    Same pipeline as train_for_stock / predict_volatility, for every
+    ticker in the panel at once.
+    """
+    panel = panel_add_contagion_features(panel)
+    panel = panel_compute_returns(panel)
+    panel = panel_compute_vol_past(panel)
+
+    if with_labels:
+        panel = panel_generate_volatility_expansion_label(panel)
+
+    return panel_add_volatility_regime_features(panel)
+
+
+if __name__ == "__main__":
+    import time
+
+    from src.label_generation import compute_returns
+    from src.feature_engineering import (
+        compute_vol_past,
+        add_volatility_regime_features
+    )
+    from src.market_features import add_contagion_features, universe_features
+
+    rng = np.random.default_rng(7)
+    n_days = 1500
+    dates = pd.bdate_range("2019-01-01", periods=n_days)
+
+    def synthetic_frame():
+        close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.015, n_days)))
+        return pd.DataFrame({
+            "Date": dates,
+            "Close": close,
+            "Volume": rng.integers(100_000, 1_000_000, n_days).astype(float)
+        })
+
+    print("===== PANEL FEATURE BENCHMARK =====")
+    print(f"{'tickers':>8} {'per-ticker (s)':>15} {'panel (s)':>10} {'speedup':>8}")
+
+    for n_tickers in (10, 50, 100, 500):
+        frames = {f"T{i:03d}": synthetic_frame() for i in range(n_tickers)}
+        panel = build_panel(frames)
+
+        start = time.perf_counter()
+        universe = universe_features(frames)
+        per_ticker = {}
+        for ticker, df in frames.items():
+            df = add_contagion_features(df, ticker, universe)
+            df = compute_returns(df)
+            df = compute_vol_past(df)
+            per_ticker[ticker] = add_volatility_regime_features(df)
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        out = build_panel_features(panel)
+        panel_time = time.perf_counter() - start
+
+        check = out[out[TICKER_COL] == "T000"].reset_index(drop=True)
+        for feature in ("trend_strength", "market_beta"):
+            max_err = np.nanmax(np.abs(check[feature] - per_ticker["T000"][feature]))
+            assert max_err < 1e-9, (feature, max_err)
+
+        print(
+            f"{n_tickers:>8} {loop_time:>15.3f} {panel_time:>10.3f} "
+            f"{loop_time / panel_time:>7.1f}x"
+        )
@@ -0,0 +1,331 @@
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+
+# -----------------------------
+# On-demand sampling profiler
+# -----------------------------
+# Opt-in only: set PROFILE=1 to profile every /analyze request and
+# training run, or send `X-Profile: 1` with a single request. When off,
+# callers get a nullcontext and nothing else runs.
+#
+# A sampler thread reads, each PROFILE_INTERVAL_MS, the Python stacks of
+# the thread that started the profile (the request / training thread)
+# and of threads currently doing work for it: the active profiler is a
+# contextvar, and Deadline.run copies the context into its stage threads
+# and runs the stage through in_profiled_thread. Concurrent requests stay
+# out of each other's profiles. Output is a speedscope file (one profile
+# per thread), viewable at https://www.speedscope.app as a flamegraph /
+# time order.
+PROFILE_ENV = "PROFILE"
+PROFILE_HEADER = "X-Profile"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+_ACTIVE = contextvars.ContextVar("active_profiler", default=None)
+
+
+def profiling_enabled(header_value=None) -> bool:
+    flags = {"1", "true", "yes"}
+    if header_value is not None and header_value.lower() in flags:
+        return True
+    return os.getenv(PROFILE_ENV, "0").lower() in flags
+
+
+def _stack(frame):
+    """
+    Frame keys for one thread, root first.
+    """
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_qualname, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def in_profiled_thread(fn, *args, **kwargs):
+    """
+    Call fn; while it runs, this thread is sampled by the context's active
+    profiler (if any). Meant for worker threads running under a copied
+    context.
+    """
+    profiler = _ACTIVE.get()
+    if profiler is None:
+        return fn(*args, **kwargs)
+
+    thread_id = threading.get_ident()
+    profiler._attach(thread_id)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        profiler._detach(thread_id)
+
+
+class SamplingProfiler:
+    """
+    Samples the Python stacks of the starting thread and of the threads
+    attached to it via in_profiled_thread.
+    """
+
+    def __init__(self, name, interval_ms=PROFILE_INTERVAL_MS):
+        self.name = name
+        self.interval = interval_ms / 1000
+        self.path = None
+
+        self._frames = {}   # frame key -> index into the shared frame table
+        self._samples = {}  # thread id -> [(stack indices, weight ms)]
+        self._thread_names = {}
+        self._stop = threading.Event()
+        self._sampler = None
+        self._owner = None
+        self._threads = {}  # thread id -> nesting depth of attached work
+        self._threads_lock = threading.Lock()
+        self._token = None
+        self._started = None
+        self._elapsed = 0.0
+
+    def _attach(self, thread_id):
+        with self._threads_lock:
+            self._threads[thread_id] = self._threads.get(thread_id, 0) + 1
+
+    def _detach(self, thread_id):
+        with self._threads_lock:
+            self._threads[thread_id] -= 1
+            if not self._threads[thread_id]:
+                del self._threads[thread_id]
+
+    def start(self):
+        self._owner = threading.get_ident()
+        self._attach(self._owner)
+        self._token = _ACTIVE.set(self)
+        self._started = time.perf_counter()
+        self._sampler = threading.Thread(
+            target=self._run, name="profiler", daemon=True
+        )
+        self._sampler.start()
+        return self
+
+    def stop(self):
+        _ACTIVE.reset(self._token)
+        self._detach(self._owner)
+        self._stop.set()
+        self._sampler.join()
+        self._elapsed = time.perf_counter() - self._started
+        return self
+
+    def _run(self):
+        own = threading.get_ident()
+        last = time.perf_counter()
+
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight = (now - last) * 1000
+            last = now
+
+            with self._threads_lock:
+                threads = list(self._threads)
+            frames = sys._current_frames()
+
+            for thread_id in threads:
+                frame = frames.get(thread_id)
+                if frame is None or thread_id == own:
+                    continue
+
+                stack = _stack(frame)
+                indices = [self._frames.setdefault(key, len(self._frames)) for key in stack]
+                self._samples.setdefault(thread_id, []).append((indices, weight))
+
+        names = {t.ident: t.name for t in threading.enumerate()}
+        self._thread_names = {
+            thread_id: names.get(thread_id, str(thread_id)) for thread_id in self._samples
+        }
+
+    def to_speedscope(self) -> dict:
+        frames = [None] * len(self._frames)
+        for (name, filename, line), index in self._frames.items():
+            frames[index] = {"name": name, "file": filename, "line": line}
+
+        # Request / caller thread first
+        thread_ids = sorted(self._samples, key=lambda t: t != self._owner)
+
+        profiles = []
+        for thread_id in thread_ids:
+            samples = self._samples[thread_id]
+            profiles.append({
+                "type": "sampled",
+                "name": self._thread_names.get(thread_id, str(thread_id)),
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(self._elapsed * 1000, 3),
+                "samples": [stack for stack, _ in samples],
+                "weights": [round(weight, 3) for _, weight in samples]
+            })
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "src.profiling",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles
+        }
+
+    def save(self, out_dir=PROFILE_DIR) -> str:
+        os.makedirs(out_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        self.path = os.path.join(out_dir, f"{self.name}-{stamp}.speedscope.json")
+
+        with open(self.path, "w") as f:
+            json.dump(self.to_speedscope(), f, separators=(",", ":"))
+
+        return self.path
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        self.save()
+        print(f"🔥 Profile saved → {self.path} ({self._elapsed:.3f} s)")
+        return False
+
+
+def maybe_profile(name, enabled=None):
+    """
+    SamplingProfiler context when profiling is enabled (explicitly or via
+    the PROFILE env flag), else a no-op nullcontext that yields None.
+    """
+    if enabled is None:
+        enabled = profiling_enabled()
+    return SamplingProfiler(name) if enabled else nullcontext()
+
+
+# -----------------------------
+# Named stages on synthetic data
+# -----------------------------
+def synthetic_prices(n_days=1500, seed=7):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.015, n_days)))
+    return pd.DataFrame({
+        "Date": pd.bdate_range("2019-01-01", periods=n_days),
+        "Open": close, "High": close, "Low": close, "Close": close,
+        "Volume": rng.integers(100_000, 1_000_000, n_days).astype(float)
+    })
+
+
+def _synthetic_universe(n_days, n_tickers):
+    return {f"T{seed:03d}": synthetic_prices(n_days, seed) for seed in range(n_tickers)}
+
+
+def _stage_features(n_days, n_tickers):
+    from src.feature_graph import compute_features
+    from src.market_features import add_contagion_features, universe_features
+    from src.model_inference import FEATURES
+    from src.tree_model import FEATURE_SET
+
+    frames = _synthetic_universe(n_days, n_tickers)
+
+    def run():
+        universe = universe_features(frames)
+        return [
+            compute_features(add_contagion_features(df, ticker, universe), FEATURES, FEATURE_SET)
+            for ticker, df in frames.items()
+        ]
+
+    return run
+
+
+def _stage_regime(n_days, n_tickers):
+    from src.regime_features import add_regime_features
+
+    frames = _synthetic_universe(n_days, n_tickers)
+    return lambda: [add_regime_features(df) for df in frames.values()]
+
+
+def _stage_panel(n_days, n_tickers):
+    from src.panel_features import build_panel, build_panel_features
+
+    panel = build_panel(_synthetic_universe(n_days, n_tickers))
+    return lambda: build_panel_features(panel, with_labels=True)
+
+
+def _training_frames(frames):
+    from src.market_features import universe_features
+    from src.train_all_models import build_training_frame
+
+    universe = universe_features(frames)
+    return [build_training_frame(df, ticker, universe) for ticker, df in frames.items()]
+
+
+def _stage_labels(n_days, n_tickers):
+    frames = _synthetic_universe(n_days, n_tickers)
+    return lambda: _training_frames(frames)
+
+
+def _stage_train(n_days, n_tickers):
+    from src.tree_model import train_lightgbm_model
+
+    frames = _training_frames(_synthetic_universe(n_days, n_tickers))
+    return lambda: [train_lightgbm_model(df) for df in frames]
+
+
+def _stage_pipeline(n_days, n_tickers):
+    # Full run_pipeline per ticker: synthetic prices, no news, extractive
+    # summary (no network). Scores use the model files in models/. Every
+    # supported ticker gets prices, since the contagion features need the
+    # whole universe.
+    import src.model_inference as model_inference
+    from src.agentic_context import run_pipeline
+
+    universe = sorted(model_inference.SUPPORTED_TICKERS)
+    tickers = universe[:n_tickers]
+    prices = {t: synthetic_prices(n_days, seed) for seed, t in enumerate(universe)}
+    model_inference.fetch_nse_data = lambda ticker: prices[ticker]
+
+    def run():
+        model_inference._PREDICTION_CACHE.clear()
+        return [
+            run_pipeline(t, news=[], summarizer="extractive") for t in tickers
+        ]
+
+    return run
+
+
+STAGES = {
+    "features": _stage_features,
+    "regime": _stage_regime,
+    "panel": _stage_panel,
+    "labels": _stage_labels,
+    "train": _stage_train,
+    "pipeline": _stage_pipeline,
+}
+
+
+def profile_stage(stage, n_days=1500, n_tickers=10, repeat=5, out_dir=PROFILE_DIR):
+    """
+    Build synthetic inputs for a named stage, then profile `repeat` runs.
+    Returns the speedscope file path.
+    """
+    if stage not in STAGES:
+        raise ValueError(f"Unknown stage '{stage}'. Available: {sorted(STAGES)}")
+
+    run = STAGES[stage](n_days, n_tickers)
+    run()  # warm imports / caches outside the profile
+
+    profiler = SamplingProfiler(f"stage-{stage}").start()
+    for _ in range(repeat):
+        run()
+    profiler.stop()
+
+    return profiler.save(out_dir)
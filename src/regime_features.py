@@ -1,22 +1,31 @@
 import numpy as np
 import pandas as pd
 
+from src.rolling_stats import rolling_stat, rolling_stats
+
 
 def add_regime_features(df):
     df = df.copy()
 
+    stats = rolling_stats(
+        df,
+        [
+            ("log_return", 20, "std"),
+            ("log_return", 252, "std"),
+            ("Close", 20, "mean"),
+            ("Close", 20, "std"),
+        ],
+        names=["vol_20", "vol_252", "close_mean", "close_std"]
+    )
+
     # ----------------------------
     # Volatility context
     # ----------------------------
-    df["vol_20"] = df["log_return"].rolling(20).std()
-    df["vol_252"] = df["log_return"].rolling(252).std()
+    df["vol_20"] = stats["vol_20"]
+    df["vol_252"] = stats["vol_252"]
 
     # Volatility percentile (context)
-    df["vol_percentile"] = (
-        df["vol_20"]
-        .rolling(252)
-        .apply(lambda x: pd.Series(x).rank(pct=True).iloc[-1])
-    )
+    df["vol_percentile"] = rolling_stat(df["vol_20"], 252, "rank_pct")
 
     # ----------------------------
     # Compression signal
@@ -26,8 +35,8 @@ def add_regime_features(df):
     # ----------------------------
     # Trend / regime strength
     # ----------------------------
-    rolling_mean = df["Close"].rolling(20).mean()
-    rolling_std = df["Close"].rolling(20).std()
+    rolling_mean = stats["close_mean"]
+    rolling_std = stats["close_std"]
 
     df["trend_strength"] = (
         (df["Close"] - rolling_mean).abs() / rolling_std
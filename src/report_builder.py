@@ -13,7 +13,11 @@ def build_final_report(state: Dict) -> Dict:
 
         "model": {
             "risk_score": round(state["risk_score"], 6),
-            "risk_bucket": state["risk_bucket"]
+            "risk_bucket": state["risk_bucket"],
+            "model_version": state.get("model_version", ""),
+            # Bar date the score is for; "date" above is the request day
+            "as_of": state.get("as_of"),
+            "contributions": state.get("contributions", {})
         },
 
         "context": {
@@ -30,7 +34,10 @@ def build_final_report(state: Dict) -> Dict:
 
         "explanation": {
             "summary": state["summary"],
-            "news_count": len(state["news"]) if state.get("news") else 0
+            "summarizer": state.get("summarizer", "llm"),
+            "summary_degraded": state.get("summary_degraded", False),
+            "news_count": len(state["news"]) if state.get("news") else 0,
+            "news_filter": state.get("news_filter", {})
         },
 
         "metadata": {
@@ -39,4 +46,8 @@ def build_final_report(state: Dict) -> Dict:
         }
     }
 
+    deadline = state.get("deadline")
+    if deadline is not None:
+        report["metadata"]["latency"] = deadline.metadata()
+
     return report
@@ -0,0 +1,430 @@
+import base64
+import json
+import os
+import queue
+import sqlite3
+import threading
+
+
+# -----------------------------
+# Append-only report store (SQLite, WAL)
+# -----------------------------
+# Every final report is appended to `reports`; `latest_reports` keeps one
+# pointer row per ticker so "latest for every ticker" never scans history.
+# History pages use keyset pagination on the (ticker, date, generated_at)
+# index, so query latency does not grow with the number of stored rows.
+REPORT_STORE_PATH = os.getenv("REPORT_STORE_PATH", "data/reports.sqlite")
+
+WRITE_BATCH_SIZE = 256
+WRITE_FLUSH_SECONDS = 0.5
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id            INTEGER PRIMARY KEY,
+    ticker        TEXT NOT NULL,
+    date          TEXT NOT NULL,
+    generated_at  TEXT NOT NULL,
+    risk_score    REAL,
+    risk_bucket   TEXT,
+    signal        TEXT,
+    model_version TEXT,
+    as_of         TEXT,
+    report        TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_reports_ticker_date_generated
+    ON reports (ticker, date, generated_at);
+
+CREATE TABLE IF NOT EXISTS latest_reports (
+    ticker        TEXT PRIMARY KEY,
+    report_id     INTEGER NOT NULL,
+    date          TEXT NOT NULL,
+    generated_at  TEXT NOT NULL
+);
+"""
+
+_UPSERT_LATEST = """
+INSERT INTO latest_reports (ticker, report_id, date, generated_at)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (ticker) DO UPDATE SET
+    report_id = excluded.report_id,
+    date = excluded.date,
+    generated_at = excluded.generated_at
+WHERE (excluded.date, excluded.generated_at)
+    > (latest_reports.date, latest_reports.generated_at)
+"""
+
+
+# Columns served by the universe risk table, in output order. as_of is
+# the bar date the score was computed for (not the request day); it is
+# NULL for reports stored before it was recorded.
+RISK_TABLE_COLUMNS = [
+    "ticker", "as_of", "risk_score", "risk_bucket", "model_version", "generated_at"
+]
+_AS_OF = "COALESCE(r.as_of, json_extract(r.report, '$.model.as_of'))"
+RISK_TABLE_SORTS = {
+    "ticker": "u.ticker",
+    "risk_score": "r.risk_score",
+    "risk_bucket": "CASE r.risk_bucket WHEN 'low' THEN 0 WHEN 'medium' THEN 1 WHEN 'high' THEN 2 END",
+    "as_of": _AS_OF,
+    "date": _AS_OF,  # former name of as_of
+}
+
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, n_fields: int):
+    """
+    The n_fields values encode_cursor packed; ValueError for anything else
+    (bad base64/JSON, or JSON that is not a list of n_fields scalars).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        raise ValueError("Invalid pagination cursor")
+
+    if (
+        not isinstance(values, list)
+        or len(values) != n_fields
+        or not all(isinstance(v, (str, int, float)) for v in values)
+    ):
+        raise ValueError("Invalid pagination cursor")
+
+    return values
+
+
+def _row(report: dict):
+    return (
+        report["ticker"],
+        report["date"],
+        report["metadata"]["generated_at"],
+        report["model"]["risk_score"],
+        report["model"]["risk_bucket"],
+        report["final_decision"]["signal"],
+        report["model"].get("model_version"),
+        report["model"].get("as_of"),
+        json.dumps(report, separators=(",", ":"))
+    )
+
+
+class ReportStore:
+    """
+    SQLite-backed history of final reports.
+
+    add() only enqueues; a background writer commits batches so the
+    request path never waits on disk.
+    """
+
+    def __init__(self, path=REPORT_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+            # Stores created before model_version / as_of were columns
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(reports)")}
+            for column in ("model_version", "as_of"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE reports ADD COLUMN {column} TEXT")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _conn(self):
+        # One connection per thread: sqlite3 connections are not shareable
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    # -----------------------------
+    # Writes
+    # -----------------------------
+    def add(self, report: dict):
+        self._ensure_writer()
+        self._queue.put(report)
+
+    def write_batch(self, reports):
+        """
+        Synchronously append reports in one transaction.
+        """
+        if not reports:
+            return
+
+        conn = self._conn()
+        with conn:
+            for report in reports:
+                row = _row(report)
+                cursor = conn.execute(
+                    "INSERT INTO reports (ticker, date, generated_at, risk_score, "
+                    "risk_bucket, signal, model_version, as_of, report) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    row
+                )
+                conn.execute(
+                    _UPSERT_LATEST, (row[0], cursor.lastrowid, row[1], row[2])
+                )
+
+    def flush(self):
+        """
+        Block until everything enqueued so far is committed.
+        """
+        if self._writer is not None:
+            self._queue.join()
+
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="report-store", daemon=True
+                )
+                self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=WRITE_FLUSH_SECONDS))
+                except queue.Empty:
+                    break
+
+            try:
+                self.write_batch(batch)
+            except Exception as e:
+                # Retry one by one so a single bad report (or a transient
+                # error) loses as little as possible; nothing here may
+                # stop the thread, or flush() would wait forever
+                print(f"⚠️ Report store batch write failed ({len(batch)} reports): {e!r}")
+                for report in batch:
+                    try:
+                        self.write_batch([report])
+                    except Exception as e:
+                        print(f"⚠️ Report store dropped a report: {e!r}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def history(self, ticker: str, limit=DEFAULT_PAGE_SIZE, cursor=None):
+        """
+        Reports for one ticker, newest first.
+        Returns {"items": [...], "next_cursor": str | None}.
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        params = [ticker.upper()]
+        where = "ticker = ?"
+
+        if cursor:
+            date, generated_at, row_id = decode_cursor(cursor, 3)
+            where += " AND (date, generated_at, id) < (?, ?, ?)"
+            params += [date, generated_at, row_id]
+
+        rows = self._conn().execute(
+            f"SELECT id, date, generated_at, report FROM reports "
+            f"WHERE {where} "
+            f"ORDER BY date DESC, generated_at DESC, id DESC LIMIT ?",
+            params + [limit + 1]
+        ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            row_id, date, generated_at, _ = rows[limit - 1]
+            next_cursor = encode_cursor(date, generated_at, row_id)
+            rows = rows[:limit]
+
+        return {
+            "items": [json.loads(row[3]) for row in rows],
+            "next_cursor": next_cursor
+        }
+
+    def latest(self, limit=DEFAULT_PAGE_SIZE, cursor=None):
+        """
+        Latest report for every ticker, ordered by ticker.
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        params = []
+        where = ""
+
+        if cursor:
+            (after_ticker,) = decode_cursor(cursor, 1)
+            where = "WHERE l.ticker > ?"
+            params.append(after_ticker)
+
+        rows = self._conn().execute(
+            f"SELECT l.ticker, r.report FROM latest_reports l "
+            f"JOIN reports r ON r.id = l.report_id "
+            f"{where} ORDER BY l.ticker LIMIT ?",
+            params + [limit + 1]
+        ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(rows[limit - 1][0])
+            rows = rows[:limit]
+
+        return {
+            "items": [json.loads(row[1]) for row in rows],
+            "next_cursor": next_cursor
+        }
+
+    def risk_table(self, tickers=None, buckets=None, min_score=None, max_score=None,
+                   sort="ticker", descending=False, batch_size=1000):
+        """
+        Latest risk row per ticker (RISK_TABLE_COLUMNS), filtered and
+        sorted in SQL. Yields lists of at most batch_size tuples so
+        callers can stream the table without holding all of it.
+
+        tickers: the universe to report on. Every one of them gets a row;
+        tickers without a stored report have NULL in every other column
+        (and are excluded by bucket / score filters). None: only tickers
+        with a stored report.
+        """
+        if sort not in RISK_TABLE_SORTS:
+            raise ValueError(
+                f"Unknown sort '{sort}'. Available: {sorted(RISK_TABLE_SORTS)}"
+            )
+
+        clauses, params = [], []
+        if buckets:
+            clauses.append(f"r.risk_bucket IN ({', '.join('?' * len(buckets))})")
+            params += list(buckets)
+        if min_score is not None:
+            clauses.append("r.risk_score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append("r.risk_score <= ?")
+            params.append(max_score)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        direction = "DESC" if descending else "ASC"
+        order = RISK_TABLE_SORTS[sort]
+
+        if tickers is None:
+            universe = "SELECT ticker FROM latest_reports"
+            universe_params = []
+        else:
+            # VALUES rather than a UNION chain: no compound-select limit
+            universe_params = sorted({t.upper() for t in tickers})
+            universe = ("VALUES " + ", ".join(["(?)"] * len(universe_params))
+                        if universe_params else "SELECT NULL WHERE 0")
+
+        # Rows are consumed lazily (possibly from another thread by a
+        # streaming response), so this uses its own connection
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        try:
+            # Unreported tickers sort last in either direction
+            cursor = conn.execute(
+                f"WITH universe(ticker) AS ({universe}) "
+                f"SELECT u.ticker, {_AS_OF}, r.risk_score, r.risk_bucket, "
+                f"COALESCE(r.model_version, "
+                f"json_extract(r.report, '$.model.model_version')), "
+                f"l.generated_at "
+                f"FROM universe u "
+                f"LEFT JOIN latest_reports l ON l.ticker = u.ticker "
+                f"LEFT JOIN reports r ON r.id = l.report_id "
+                f"{where} ORDER BY ({order}) IS NULL, {order} {direction}, u.ticker",
+                universe_params + params
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_report_store() -> ReportStore:
+    global _STORE
+
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = ReportStore()
+
+    return _STORE
+
+
+def _page(store, ticker, n):
+    cursor = None
+    for _ in range(n):
+        page = store.history(ticker, limit=50, cursor=cursor)
+        cursor = page["next_cursor"]
+    return page
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+    from datetime import date, timedelta
+
+    def fake_report(ticker, day, i):
+        return {
+            "ticker": ticker,
+            "date": day,
+            "model": {"risk_score": (i % 100) / 100, "risk_bucket": "low"},
+            "context": {},
+            "final_decision": {"signal": "stable", "confidence": "high"},
+            "explanation": {"summary": "", "news_count": 0},
+            "metadata": {"generated_at": f"{day}T10:00:{i % 60:02d}Z"},
+        }
+
+    tickers = [f"T{i:03d}" for i in range(500)]
+    start_day = date(2015, 1, 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ReportStore(os.path.join(tmp, "reports.sqlite"))
+
+        print("===== REPORT STORE QUERY LATENCY =====")
+        total, day_offset = 0, 0
+
+        for target in (10_000, 100_000, 1_000_000):
+            while total < target:
+                day = (start_day + timedelta(days=day_offset)).isoformat()
+                store.write_batch([
+                    fake_report(t, day, total + i) for i, t in enumerate(tickers)
+                ])
+                total += len(tickers)
+                day_offset += 1
+
+            timings = {}
+            for name, query in (
+                ("history page 1", lambda: store.history("T123", limit=50)),
+                ("history page 5", lambda: _page(store, "T123", 5)),
+                ("latest page 1", lambda: store.latest(limit=100)),
+            ):
+                start = time.perf_counter()
+                for _ in range(20):
+                    query()
+                timings[name] = (time.perf_counter() - start) / 20 * 1000
+
+            print(f"{total:>9} rows: " + " | ".join(
+                f"{name} {ms:.2f} ms" for name, ms in timings.items()
+            ))
@@ -1,7 +1,18 @@
-def bucket_risk(score: float) -> str:
-    if score < 0.20:
-        return "low"
-    elif score < 0.40:
-        return "medium"
-    else:
-        return "high"
+import numpy as np
+
+
+# Bucket boundaries on calibrated probabilities (src.calibration):
+# low < 0.20 <= medium < 0.40 <= high
+RISK_THRESHOLDS = [0.20, 0.40]
+RISK_BUCKETS = np.array(["low", "medium", "high"])
+
+
+def bucket_risks(scores, thresholds=RISK_THRESHOLDS) -> np.ndarray:
+    """
+    Vectorized bucketing: one searchsorted for any number of scores.
+    """
+    return RISK_BUCKETS[np.searchsorted(thresholds, scores, side="right")]
+
+
+def bucket_risk(score: float, thresholds=RISK_THRESHOLDS) -> str:
+    return str(bucket_risks([score], thresholds)[0])
@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-from feature_engineering import add_volatility_regime_features
+from src.feature_engineering import add_volatility_regime_features
 
 
 def time_based_split(df, train_ratio=0.7, val_ratio=0.15):
@@ -45,8 +45,8 @@ def sanity_checks(train_df, val_df, test_df):
 
 
 if __name__ == "__main__":
-    from data_ingestion import fetch_nse_data
-    from label_generation import compute_returns, generate_volatility_expansion_label
+    from src.data_ingestion import fetch_nse_data
+    from src.label_generation import compute_returns, generate_volatility_expansion_label
 
     df = fetch_nse_data("RELIANCE")
     df = compute_returns(df)
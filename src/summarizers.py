@@ -0,0 +1,350 @@
+import re
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+
+# -----------------------------
+# Summarizer registry
+# -----------------------------
+# A summarizer is fn(ticker, date, headlines, timeout=None) -> str, where
+# timeout (seconds) bounds any I/O it does. Its output goes straight into
+# classify_context, so it must keep the headline wording (the classifier
+# is keyword based).
+SUMMARIZERS = {}
+
+DEFAULT_SUMMARIZER = "auto"
+
+_LATENCY = {}  # name -> (EWMA of call latency in seconds, time.monotonic() of last call)
+_LATENCY_ALPHA = 0.2
+# The estimate halves for every LATENCY_HALF_LIFE_S without a call. "auto"
+# stops calling a summarizer whose estimate is over budget, so without the
+# decay one slow call would disable it for good; with it, the next call is
+# a probe once the estimate has decayed back under the budget.
+LATENCY_HALF_LIFE_S = 60.0
+_LOCK = threading.Lock()
+
+
+def register_summarizer(name):
+    def decorator(fn):
+        SUMMARIZERS[name] = fn
+        return fn
+
+    return decorator
+
+
+def _decayed(entry, now):
+    value, at = entry
+    return value * 0.5 ** ((now - at) / LATENCY_HALF_LIFE_S)
+
+
+def record_latency(name: str, seconds: float, now=None):
+    now = time.monotonic() if now is None else now
+
+    with _LOCK:
+        previous = _LATENCY.get(name)
+        _LATENCY[name] = (
+            seconds if previous is None
+            else _LATENCY_ALPHA * seconds + (1 - _LATENCY_ALPHA) * _decayed(previous, now),
+            now
+        )
+
+
+def latency_estimate(name: str, now=None):
+    """
+    Smoothed recent latency of a summarizer in seconds (None if unseen),
+    decayed by the time since its last call.
+    """
+    entry = _LATENCY.get(name)
+    if entry is None:
+        return None
+    return _decayed(entry, time.monotonic() if now is None else now)
+
+
+def choose_summarizer(requested=DEFAULT_SUMMARIZER, budget_ms=None, now=None) -> str:
+    """
+    Resolve "auto": use the LLM unless its recent latency would blow the
+    remaining budget, in which case fall back to the local extractive one.
+    """
+    if requested != "auto":
+        if requested not in SUMMARIZERS:
+            raise ValueError(
+                f"Unknown summarizer '{requested}'. "
+                f"Available: {sorted(SUMMARIZERS) + ['auto']}"
+            )
+        return requested
+
+    if "llm" not in SUMMARIZERS:
+        return "extractive"
+
+    estimate = latency_estimate("llm", now)
+    if budget_ms is not None and estimate is not None and estimate * 1000 > budget_ms:
+        return "extractive"
+
+    return "llm"
+
+
+def summarize(name: str, ticker: str, date: str, headlines, timeout=None) -> str:
+    start = time.perf_counter()
+    failed = True
+    try:
+        summary = SUMMARIZERS[name](ticker, date, headlines, timeout=timeout)
+        failed = False
+        return summary
+    finally:
+        # Failed and timed-out calls count too (as at least the time they
+        # were allowed), or a hung LLM would never push "auto" off it
+        elapsed = time.perf_counter() - start
+        if failed and timeout is not None:
+            elapsed = max(elapsed, timeout)
+        record_latency(name, elapsed)
+
+
+# -----------------------------
+# Extractive backend (TF-IDF + TextRank)
+# -----------------------------
+EXTRACTIVE_MAX_SENTENCES = 3
+
+_STOPWORDS = {
+    "a", "an", "the", "of", "to", "in", "on", "for", "and", "or", "as",
+    "at", "by", "with", "from", "is", "are", "its", "after", "amid", "over"
+}
+
+
+def _tokens(text: str):
+    text = re.sub(r"\s+-\s+[^-]+$", "", text)  # Google News publisher suffix
+    return [
+        token for token in re.findall(r"[a-z0-9]+", text.lower())
+        if token not in _STOPWORDS
+    ]
+
+
+def textrank_scores(headlines, damping=0.85, iterations=50) -> np.ndarray:
+    """
+    TextRank centrality of each headline over TF-IDF cosine similarity.
+    """
+    docs = [Counter(_tokens(h)) for h in headlines]
+    vocab = sorted({token for doc in docs for token in doc})
+    if not vocab:
+        return np.ones(len(headlines)) / max(len(headlines), 1)
+
+    index = {token: i for i, token in enumerate(vocab)}
+    n = len(docs)
+
+    tf = np.zeros((n, len(vocab)))
+    for row, doc in enumerate(docs):
+        for token, count in doc.items():
+            tf[row, index[token]] = count
+
+    df = (tf > 0).sum(axis=0)
+    tfidf = tf * np.log((1 + n) / (1 + df) + 1)
+
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    unit = np.divide(tfidf, norms, out=np.zeros_like(tfidf), where=norms > 0)
+
+    similarity = unit @ unit.T
+    np.fill_diagonal(similarity, 0.0)
+
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(
+        similarity, row_sums,
+        out=np.full_like(similarity, 1.0 / n), where=row_sums > 0
+    )
+
+    scores = np.ones(n) / n
+    for _ in range(iterations):
+        scores = (1 - damping) / n + damping * transition.T @ scores
+
+    return scores
+
+
+@register_summarizer("extractive")
+def extractive_summarize(ticker: str, date: str, headlines, timeout=None) -> str:
+    """
+    Zero-network summary: the most central distinct headlines, verbatim.
+    (timeout is accepted for the registry contract; there is no I/O.)
+    """
+    headlines = list(headlines)
+    k = min(EXTRACTIVE_MAX_SENTENCES, len(headlines))
+
+    scores = textrank_scores(headlines)
+    top = sorted(np.argsort(-scores, kind="stable")[:k])
+
+    selected = [
+        re.sub(r"\s+-\s+[^-]+$", "", headlines[i]).strip().rstrip(".")
+        for i in top
+    ]
+
+    return (
+        f"Most representative headlines for {ticker} around {date}: "
+        + "; ".join(selected)
+        + "."
+    )
+
+
+# -----------------------------
+# Benchmark against recorded LLM fixtures
+# -----------------------------
+# `record` saves live headlines, LLM summaries and call latencies. No
+# recorded set is committed yet: the committed file is a small synthetic,
+# hand-written set ("source": "synthetic", no latency) that only smoke-
+# tests the comparison offline. Its agreement figure measures nothing
+# about the real LLM; run `record` and compare against that file instead.
+FIXTURES_PATH = "data/fixtures/summarizer_fixtures.synthetic.json"
+
+def record_fixtures(path, tickers, reference_date):
+    """
+    Call the live pipeline pieces (news + LLM) and save
+    [{ticker, date, headlines, summary, latency_s, source}] for offline
+    comparison.
+    """
+    import json
+
+    from src.agentic_context import fetch_ticker_news, get_dispatcher
+
+    fixtures = []
+    for ticker in tickers:
+        headlines, _ = fetch_ticker_news(ticker, reference_date)
+        if not headlines:
+            continue
+
+        start = time.perf_counter()
+        summary = get_dispatcher().summarize(ticker, reference_date, headlines)
+        fixtures.append({
+            "ticker": ticker,
+            "date": reference_date,
+            "headlines": headlines,
+            "summary": summary,
+            "latency_s": round(time.perf_counter() - start, 4),
+            "source": "recorded"
+        })
+
+    with open(path, "w") as f:
+        json.dump(fixtures, f, indent=2)
+
+    return fixtures
+
+
+def compare_with_fixtures(path=FIXTURES_PATH):
+    """
+    Latency and classify_context agreement: extractive vs recorded LLM.
+    LLM latency is only reported over recorded fixtures (synthetic ones
+    have none).
+    """
+    import json
+
+    from src.agentic_context import classify_context
+
+    with open(path) as f:
+        fixtures = json.load(f)
+
+    def classify(summary):
+        state = classify_context({"summary": summary})
+        return (state["risk_type"], state["exogenous_shock"])
+
+    agree = 0
+    extractive_latency = []
+
+    for fixture in fixtures:
+        start = time.perf_counter()
+        summary = extractive_summarize(
+            fixture["ticker"], fixture["date"], fixture["headlines"]
+        )
+        extractive_latency.append(time.perf_counter() - start)
+
+        agree += classify(summary) == classify(fixture["summary"])
+
+    n = len(fixtures)
+    recorded = [f["latency_s"] for f in fixtures if "latency_s" in f]
+    return {
+        "fixtures": n,
+        "synthetic": sum(f.get("source") == "synthetic" for f in fixtures),
+        "classification_agreement": round(agree / n, 4) if n else None,
+        "llm_latency_ms_mean": round(
+            1000 * sum(recorded) / len(recorded), 2
+        ) if recorded else None,
+        "extractive_latency_ms_mean": round(
+            1000 * sum(extractive_latency) / n, 3
+        ) if n else None
+    }
+
+
+def check_llm_recovery(budget_ms=5000):
+    """
+    One slow LLM call must not disable "auto" for good: it falls back to
+    extractive, then probes the LLM again once the estimate has decayed.
+    A call that times out counts as at least its timeout.
+    """
+    saved = dict(_LATENCY)
+    saved_llm = SUMMARIZERS.get("llm")
+
+    def hung_llm(ticker, date, headlines, timeout=None):
+        raise TimeoutError("stub LLM call timed out")
+
+    SUMMARIZERS["llm"] = hung_llm
+
+    try:
+        _LATENCY.clear()
+        record_latency("llm", 8.0, now=0.0)
+        assert choose_summarizer("auto", budget_ms, now=1.0) == "extractive"
+
+        # 8 s -> under 5 s after log2(8 / 5) half-lives
+        recovery_s = LATENCY_HALF_LIFE_S * np.log2(8.0 * 1000 / budget_ms)
+        assert choose_summarizer("auto", budget_ms, now=recovery_s + 1.0) == "llm"
+
+        # A fast probe keeps the LLM selected; a slow one backs off again
+        record_latency("llm", 1.0, now=recovery_s + 2.0)
+        assert choose_summarizer("auto", budget_ms, now=recovery_s + 3.0) == "llm"
+        record_latency("llm", 30.0, now=recovery_s + 4.0)
+        assert choose_summarizer("auto", budget_ms, now=recovery_s + 5.0) == "extractive"
+
+        # Failures never return a latency, but still count
+        _LATENCY.clear()
+        try:
+            summarize("llm", "TEST", "2026-01-05", ["headline"], timeout=budget_ms / 1000)
+        except TimeoutError:
+            pass
+        assert choose_summarizer("auto", budget_ms / 2) == "extractive"
+
+    finally:
+        _LATENCY.clear()
+        _LATENCY.update(saved)
+        if saved_llm is None:
+            SUMMARIZERS.pop("llm", None)
+        else:
+            SUMMARIZERS["llm"] = saved_llm
+
+    return recovery_s
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    from datetime import date
+
+    usage = (
+        "usage: python -m src.summarizers record <fixtures.json> [TICKER ...]\n"
+        f"       python -m src.summarizers compare [fixtures.json, default {FIXTURES_PATH}]\n"
+        "       python -m src.summarizers check-recovery"
+    )
+
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+
+    if command == "record" and len(sys.argv) >= 3:
+        from src.model_inference import SUPPORTED_TICKERS
+
+        path = sys.argv[2]
+        tickers = sys.argv[3:] or sorted(SUPPORTED_TICKERS)
+        fixtures = record_fixtures(path, tickers, date.today().isoformat())
+        print(f"Recorded {len(fixtures)} fixtures → {path}")
+    elif command == "compare":
+        path = sys.argv[2] if len(sys.argv) > 2 else FIXTURES_PATH
+        print(json.dumps(compare_with_fixtures(path), indent=2))
+    elif command == "check-recovery":
+        recovery_s = check_llm_recovery()
+        print(f"✔ auto recovers to the LLM {recovery_s:.0f} s after an 8 s call (5 s budget)")
+    else:
+        print(usage)
+        sys.exit(1)
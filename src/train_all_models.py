@@ -1,13 +1,24 @@
+import argparse
+import json
 import os
-import joblib
+from datetime import datetime
 
-from data_ingestion import fetch_nse_data
-from label_generation import compute_returns, generate_volatility_expansion_label
-from feature_engineering import add_volatility_regime_features
-from tree_model import train_lightgbm_model
-from split_and_checks import time_based_split, sanity_checks
-from feature_engineering import compute_vol_past, add_volatility_regime_features
+import joblib
+import numpy as np
 
+from src.data_ingestion import fetch_nse_data
+from src.label_generation import generate_volatility_expansion_label
+from src.feature_graph import compute_features
+from src.tree_model import (
+    train_lightgbm_model, update_lightgbm_model, FEATURES, FEATURE_SET, TARGET
+)
+from src.calibration import (
+    apply_calibration, brier_score, fit_calibration, load_calibration, save_calibration
+)
+from src.drift_monitor import build_reference, save_reference
+from src.market_features import add_contagion_features, universe_features
+from src.split_and_checks import time_based_split, sanity_checks
+from src.profiling import maybe_profile
 
 
 STOCKS = [
@@ -21,21 +32,143 @@ STOCKS = [
 MODEL_DIR = "models"
 os.makedirs(MODEL_DIR, exist_ok=True)
 
+# -----------------------------
+# Incremental update policy
+# -----------------------------
+UPDATE_TREES = 25            # extra trees per incremental update
+MIN_UPDATE_ROWS = 20         # wait for at least this many new labelled bars
+VALIDATION_FRACTION = 0.25   # newest share of new bars held out for the gate
+GATE_TOLERANCE = 0.02        # max relative log-loss increase vs current model
+FULL_REBUILD_EVERY = 20      # incremental updates before a forced full retrain
+MAX_TREES = 1000             # forced full retrain once the booster grows past this
+
+# Calibration method for full retrains ("isotonic" or "platt"). Incremental
+# updates keep the table fitted at the last full retrain, marked stale
+# (served as-is until the next full retrain refits it)
+CALIBRATION_METHOD = "isotonic"
+CALIBRATION_FOLDS = 4        # walk-forward folds scored for the calibration fit
+CALIBRATION_START = 0.7      # share of history that only ever trains, never scored
+
+
+def training_meta_path(ticker: str) -> str:
+    return os.path.join(MODEL_DIR, f"{ticker}.train.json")
+
+
+def load_training_meta(ticker: str):
+    path = training_meta_path(ticker)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def market_universe():
+    """
+    Contagion features for the whole training universe (STOCKS).
+    """
+    return universe_features({stock: fetch_nse_data(stock, verbose=True) for stock in STOCKS})
+
+
+def build_training_frame(df, ticker: str, universe):
+    """
+    Features + labels for one ticker's OHLCV frame.
+    """
+    df = add_contagion_features(df, ticker, universe)
+
+    # Same feature code and set as predict_volatility
+    df = compute_features(df, FEATURES, feature_set=FEATURE_SET)
+    df = generate_volatility_expansion_label(df)
+
+    # Drop rows where labels not available
+    return df.dropna().reset_index(drop=True)
+
+
+def prepare_training_frame(ticker: str, universe=None):
+    if universe is None:
+        universe = market_universe()
+
+    return build_training_frame(fetch_nse_data(ticker, verbose=True), ticker, universe)
+
+
+def out_of_fold_scores(df, n_folds=CALIBRATION_FOLDS, start_ratio=CALIBRATION_START):
+    """
+    Walk-forward out-of-fold raw scores. Rows after the first start_ratio
+    are cut into n_folds chronological blocks; each block is scored by
+    train_lightgbm_model (the served model's configuration) fitted on all
+    rows before it. Returns (raw scores, labels, fold index per row).
+    """
+    bounds = np.linspace(int(len(df) * start_ratio), len(df), n_folds + 1).astype(int)
+
+    raw, y, fold = [], [], []
+    for k, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+        model = train_lightgbm_model(df.iloc[:lo])
+        block = df.iloc[lo:hi]
+        raw.append(model.predict_proba(block[FEATURES])[:, 1])
+        y.append(block[TARGET].to_numpy())
+        fold.append(np.full(len(block), k))
+
+    return np.concatenate(raw), np.concatenate(y), np.concatenate(fold)
+
+
+def fit_out_of_fold_calibration(df, method=CALIBRATION_METHOD):
+    """
+    Calibration table for the full-data model, fitted on walk-forward
+    out-of-fold scores of the same configuration: checked on the last
+    fold (fitted on the earlier ones), then refitted on every fold.
+    """
+    raw, y, fold = out_of_fold_scores(df)
+    last = fold == fold.max()
+
+    calibrated, _ = apply_calibration(fit_calibration(raw[~last], y[~last], method), raw[last])
+
+    table = fit_calibration(raw, y, method)
+    table["folds"] = int(fold.max()) + 1
+    table["test_brier"] = {
+        "raw": round(brier_score(raw[last], y[last]), 6),
+        "calibrated": round(brier_score(calibrated, y[last]), 6)
+    }
+
+    print(
+        f"✔ Calibration ({method}, {table['folds']} walk-forward folds): last-fold Brier "
+        f"{table['test_brier']['raw']:.4f} raw → {table['test_brier']['calibrated']:.4f} calibrated"
+    )
+
+    return table
+
+
+def _save(ticker, model, df, meta, calibration=None):
+    model_path = os.path.join(MODEL_DIR, f"{ticker}.pkl")
+    joblib.dump(model, model_path)
+
+    print(f"✅ Saved model → {model_path} ({meta['n_trees']} trees, {meta['mode']})")
 
-def train_for_stock(ticker: str):
+    if calibration is not None:
+        calibration_file = save_calibration(ticker, calibration, MODEL_DIR)
+        print(f"✅ Saved calibration table → {calibration_file}")
+
+    # Drift reference sketch (training feature distribution)
+    reference_file = save_reference(ticker, build_reference(df, FEATURES), MODEL_DIR)
+
+    print(f"✅ Saved drift reference → {reference_file}")
+
+    with open(training_meta_path(ticker), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def _log_loss(model, df) -> float:
+    p = np.clip(model.predict_proba(df[FEATURES])[:, 1], 1e-7, 1 - 1e-7)
+    y = df[TARGET].to_numpy()
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+
+def train_for_stock(ticker: str, df=None, universe=None, calibration_method=CALIBRATION_METHOD):
     print(f"\n===== Training model for {ticker} =====")
 
     # -------------------------
     # 1. Data ingestion + prep
     # -------------------------
-    df = fetch_nse_data(ticker)
-    df = compute_returns(df)
-    df = compute_vol_past(df)  
-    df = generate_volatility_expansion_label(df)
-    df = add_volatility_regime_features(df)
-
-    # Drop rows where labels not available
-    df = df.dropna().reset_index(drop=True)
+    if df is None:
+        df = prepare_training_frame(ticker, universe)
 
     # -------------------------
     # 2. Sanity checks (NO training here)
@@ -44,21 +177,145 @@ def train_for_stock(ticker: str):
     sanity_checks(train_df, val_df, test_df)
 
     # -------------------------
-    # 3. Final training (FULL DATA)
+    # 3. Calibration (walk-forward out-of-fold scores, same configuration)
+    # -------------------------
+    calibration = fit_out_of_fold_calibration(df, calibration_method)
+
+    # -------------------------
+    # 4. Final training (FULL DATA)
     # -------------------------
     model = train_lightgbm_model(df)
 
     # -------------------------
-    # 4. Save model
+    # 5. Save model, calibration, drift reference, training state
     # -------------------------
-    model_path = os.path.join(MODEL_DIR, f"{ticker}.pkl")
-    joblib.dump(model, model_path)
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    _save(ticker, model, df, {
+        "mode": "full",
+        "trained_through": df["Date"].max().strftime("%Y-%m-%d"),
+        "n_trees": model.booster_.current_iteration(),
+        "features": FEATURES,
+        "calibration": calibration_method,
+        "full_trained_at": today,
+        "updated_at": today,
+        "updates_since_full": 0,
+        "calibration_stale": False
+    }, calibration)
+
+    return model
 
-    print(f"✅ Saved model → {model_path}")
+
+def _full_rebuild_reason(ticker, meta, calibration_method=CALIBRATION_METHOD):
+    if meta is None:
+        return "no training state"
+    if not os.path.exists(os.path.join(MODEL_DIR, f"{ticker}.pkl")):
+        return "no model file"
+    if meta["features"] != FEATURES:
+        return "feature list changed"
+    if meta.get("calibration") != calibration_method:
+        return "calibration method changed"
+    if meta["updates_since_full"] >= FULL_REBUILD_EVERY:
+        return f"{meta['updates_since_full']} updates since last full retrain"
+    if meta["n_trees"] + UPDATE_TREES > MAX_TREES:
+        return f"booster would exceed {MAX_TREES} trees"
+    return None
+
+
+def update_for_stock(ticker: str, universe=None, calibration_method=CALIBRATION_METHOD):
+    """
+    Incremental daily update: continue boosting the saved model on bars
+    labelled since it was last trained. Falls back to a full retrain when
+    the rebuild policy says so or the validation gate fails.
+    """
+    print(f"\n===== Updating model for {ticker} =====")
+
+    df = prepare_training_frame(ticker, universe)
+    meta = load_training_meta(ticker)
+
+    reason = _full_rebuild_reason(ticker, meta, calibration_method)
+    if reason:
+        print(f"↻ Full retrain: {reason}")
+        return train_for_stock(ticker, df, calibration_method=calibration_method)
+
+    new = df[df["Date"] > meta["trained_through"]].reset_index(drop=True)
+    if len(new) < MIN_UPDATE_ROWS:
+        print(f"⏭ {len(new)} new labelled bars (< {MIN_UPDATE_ROWS}); model unchanged")
+        return None
+
+    # Fit on the older new bars, gate on the newest ones: out-of-sample
+    # for both the current and the candidate model
+    n_val = max(1, int(len(new) * VALIDATION_FRACTION))
+    fit_df, val_df = new.iloc[:-n_val], new.iloc[-n_val:]
+
+    # Calm stretches label every bar 0: wait until both classes are in
+    if fit_df[TARGET].nunique() < 2:
+        print(
+            f"⏭ {len(fit_df)} new bars hold a single class "
+            f"({int(fit_df[TARGET].iloc[0])}); model unchanged"
+        )
+        return None
+
+    current = joblib.load(os.path.join(MODEL_DIR, f"{ticker}.pkl"))
+    candidate = update_lightgbm_model(current, fit_df, UPDATE_TREES)
+
+    current_loss, candidate_loss = _log_loss(current, val_df), _log_loss(candidate, val_df)
+    print(
+        f"Gate on {n_val} bars: log-loss current {current_loss:.4f} "
+        f"→ candidate {candidate_loss:.4f}"
+    )
+
+    if candidate_loss > current_loss * (1 + GATE_TOLERANCE):
+        print("↻ Full retrain: candidate failed validation gate")
+        return train_for_stock(ticker, df, calibration_method=calibration_method)
+
+    # The table was fitted to the last full model's scores; the added
+    # trees move them, so it is kept but flagged until the next full retrain
+    updates = meta["updates_since_full"] + 1
+    calibration = load_calibration(ticker, MODEL_DIR)
+    if calibration["method"] != "none":
+        calibration = {**calibration, "stale": True, "updates_since_fit": updates}
+
+    # Held-out bars stay "new" and are trained on in the next update
+    _save(ticker, candidate, df, {
+        **meta,
+        "mode": "incremental",
+        "trained_through": fit_df["Date"].max().strftime("%Y-%m-%d"),
+        "n_trees": candidate.booster_.current_iteration(),
+        "updated_at": datetime.utcnow().strftime("%Y-%m-%d"),
+        "updates_since_full": updates,
+        "calibration_stale": calibration["method"] != "none",
+        "gate": {
+            "rows": n_val,
+            "current_log_loss": round(current_loss, 6),
+            "candidate_log_loss": round(candidate_loss, 6)
+        }
+    }, calibration if calibration["method"] != "none" else None)
+
+    return candidate
 
 
 if __name__ == "__main__":
-    for stock in STOCKS:
-        train_for_stock(stock)
+    parser = argparse.ArgumentParser(description="Train or update per-stock models")
+    parser.add_argument(
+        "--mode", choices=["full", "incremental"], default="full",
+        help="full: retrain from scratch; incremental: warm-start on new bars"
+    )
+    parser.add_argument("--tickers", nargs="*", default=STOCKS)
+    parser.add_argument(
+        "--calibration", choices=["isotonic", "platt"], default=CALIBRATION_METHOD,
+        help="probability calibration fitted at each full retrain"
+    )
+    args = parser.parse_args()
+
+    # Fetched once: every ticker's contagion features share the universe
+    universe = market_universe()
+
+    for stock in args.tickers:
+        # PROFILE=1 saves a speedscope profile per training run
+        with maybe_profile(f"train-{stock}"):
+            if args.mode == "incremental":
+                update_for_stock(stock, universe, args.calibration)
+            else:
+                train_for_stock(stock, universe=universe, calibration_method=args.calibration)
 
     print("\n🎯 All stock models trained successfully.")
@@ -6,11 +6,18 @@ FEATURES = [
     "Volume",
     "vol_percentile",
     "vol_compression",
-    "trend_strength"
+    "trend_strength",
+    "market_vol",
+    "sector_vol",
+    "market_beta",
+    "avg_correlation"
 ]
 
 TARGET = "vol_expansion"
 
+# Feature definitions (src.feature_graph) shared by training and serving
+FEATURE_SET = "v1"
+
 
 def train_lightgbm_model(df):
     """
@@ -37,3 +44,31 @@ def train_lightgbm_model(df):
     model.fit(X, y)
 
     return model
+
+
+def update_lightgbm_model(model, df, extra_trees=25):
+    """
+    Continue boosting an existing model on new rows only.
+    Adds at most `extra_trees` trees on top of the current booster.
+    Raises ValueError when the rows hold a single class: LightGBM would
+    fit a one-class model (classes_ == [0]) that cannot score the other.
+    """
+
+    X = df[FEATURES]
+    y = df[TARGET]
+
+    if y.nunique() < 2:
+        raise ValueError(f"Update window has a single class ({sorted(y.unique())}); need both")
+
+    params = model.get_params()
+    params.update(
+        n_estimators=extra_trees,
+        # New-bar batches are small; the full-history leaf minimum
+        # would leave every added tree as a single leaf
+        min_child_samples=min(params["min_child_samples"], max(5, len(df) // 10))
+    )
+
+    updated = LGBMClassifier(**params)
+    updated.fit(X, y, init_model=model.booster_)
+
+    return updated